@@ -5,7 +5,11 @@ Demonstrates Grover's search algorithm using the FPGA-accelerated simulator.
 Grover's algorithm provides quadratic speedup for unstructured search problems.
 """
 
+import functools
+import math
 import numpy as np
+import jax
+import jax.numpy as jnp
 from simulator.circuit import QuantumCircuit
 from simulator import quantum_gates
 from typing import List, Callable
@@ -25,17 +29,14 @@ def create_oracle(circuit: QuantumCircuit, target_state: int, num_qubits: int):
     # Multi-controlled Z gate marking the target state
     # For simplicity, we'll use a phase flip approach
     
-    # Convert target_state to binary representation
-    target_bits = []
-    temp = target_state
-    for _ in range(num_qubits):
-        target_bits.append(temp & 1)
-        temp >>= 1
+    # Convert target_state to binary representation (least significant bit first)
+    # and select, once, the qubits that are 0 in the target state
+    target_bits = ((target_state >> np.arange(num_qubits)) & 1).astype(np.uint8)
+    zero_qubits = np.flatnonzero(target_bits == 0).tolist()
     
     # Apply X gates to qubits that are 0 in target state
-    for i, bit in enumerate(target_bits):
-        if bit == 0:
-            circuit.x(i)
+    for q in zero_qubits:
+        circuit.x(q)
     
     # Apply multi-controlled Z (mark the |11...1⟩ state)
     # For 2 qubits: CZ
@@ -60,9 +61,8 @@ def create_oracle(circuit: QuantumCircuit, target_state: int, num_qubits: int):
         circuit.z(num_qubits - 1)
     
     # Uncompute X gates
-    for i, bit in enumerate(target_bits):
-        if bit == 0:
-            circuit.x(i)
+    for q in zero_qubits:
+        circuit.x(q)
 
 
 def grover_diffusion(circuit: QuantumCircuit, num_qubits: int):
@@ -108,6 +108,38 @@ def grover_diffusion(circuit: QuantumCircuit, num_qubits: int):
         circuit.h(i)
 
 
+# Above this size G^k is applied iteration by iteration instead of as one matrix power
+MATRIX_POWER_MAX_QUBITS = 8
+
+
+def grover_operator(num_qubits: int, target_state: int) -> np.ndarray:
+    """
+    Build one Grover iteration G = D·O as a single dense unitary.
+    
+    Both the oracle O = I - 2|t⟩⟨t| and the diffusion D = 2|s⟩⟨s| - I depend only
+    on (num_qubits, target_state), so they are fused once instead of being
+    rebuilt gate by gate on every iteration.
+    
+    Args:
+        num_qubits: Number of qubits
+        target_state: Integer representation of target state
+        
+    Returns:
+        Grover operator matrix (2^num_qubits × 2^num_qubits)
+    """
+    dim = 1 << num_qubits
+    
+    # Oracle: phase flip on the target basis state
+    oracle = np.eye(dim, dtype=np.complex128)
+    oracle[target_state, target_state] = -1.0
+    
+    # Diffusion: inversion about the uniform superposition |s⟩
+    uniform = np.full(dim, 1 / math.sqrt(dim), dtype=np.complex128)
+    diffusion = 2 * np.outer(uniform, uniform) - np.eye(dim, dtype=np.complex128)
+    
+    return diffusion @ oracle
+
+
 def grover_search(num_qubits: int, target_state: int, num_iterations: int = None) -> QuantumCircuit:
     """
     Implement Grover's search algorithm.
@@ -120,12 +152,13 @@ def grover_search(num_qubits: int, target_state: int, num_iterations: int = None
     Returns:
         Quantum circuit implementing Grover's algorithm
     """
-    if target_state < 0 or target_state >= 2 ** num_qubits:
-        raise ValueError(f"Target state must be in [0, {2**num_qubits - 1}]")
+    N = 1 << num_qubits
+    if target_state < 0 or target_state >= N:
+        raise ValueError(f"Target state must be in [0, {N - 1}]")
     
     # Optimal number of iterations ≈ π/4 * sqrt(N)
     if num_iterations is None:
-        num_iterations = int(np.round(np.pi / 4 * np.sqrt(2 ** num_qubits)))
+        num_iterations = int(round(math.pi / 4 * math.sqrt(N)))
     
     circuit = QuantumCircuit(num_qubits, use_jax=True)
     
@@ -133,17 +166,54 @@ def grover_search(num_qubits: int, target_state: int, num_iterations: int = None
     for i in range(num_qubits):
         circuit.h(i)
     
-    # Apply Grover iterations
-    for _ in range(num_iterations):
-        # Oracle: mark target state
-        create_oracle(circuit, target_state, num_qubits)
-        
-        # Diffusion: invert about mean
-        grover_diffusion(circuit, num_qubits)
+    # Apply Grover iterations using the fused oracle + diffusion operator.
+    # Qubits are listed most-significant first so the operator acts on basis
+    # states in index order.
+    grover_op = grover_operator(num_qubits, target_state)
+    qubits = list(range(num_qubits - 1, -1, -1))
+    if num_qubits <= MATRIX_POWER_MAX_QUBITS:
+        circuit.apply(np.linalg.matrix_power(grover_op, num_iterations), *qubits)
+    else:
+        for _ in range(num_iterations):
+            circuit.apply(grover_op, *qubits)
     
     return circuit
 
 
+@functools.partial(jax.jit, static_argnames=('num_iterations',))
+def _iterate_grover(grover_op: jnp.ndarray, state: jnp.ndarray, num_iterations: int) -> jnp.ndarray:
+    """Apply G to the state num_iterations times inside one compiled on-device loop."""
+    return jax.lax.fori_loop(0, num_iterations, lambda _, s: grover_op @ s, state)
+
+
+def grover_statevector(num_qubits: int, target_state: int, num_iterations: int = None) -> np.ndarray:
+    """
+    Compute the final Grover statevector in a single JIT dispatch.
+    
+    Starts from the uniform superposition (H on every qubit) and reapplies the
+    fused Grover operator with ``jax.lax.fori_loop``, so all iterations run
+    on device instead of being dispatched one by one from Python.
+    
+    Args:
+        num_qubits: Number of qubits (search space size = 2^num_qubits)
+        target_state: Target state to find (0 to 2^num_qubits - 1)
+        num_iterations: Number of Grover iterations (default: optimal)
+        
+    Returns:
+        Final statevector as numpy array
+    """
+    N = 1 << num_qubits
+    if target_state < 0 or target_state >= N:
+        raise ValueError(f"Target state must be in [0, {N - 1}]")
+    
+    if num_iterations is None:
+        num_iterations = int(round(math.pi / 4 * math.sqrt(N)))
+    
+    initial_state = jnp.full(N, 1 / math.sqrt(N), dtype=jnp.complex128)
+    grover_op = jnp.asarray(grover_operator(num_qubits, target_state))
+    return np.array(_iterate_grover(grover_op, initial_state, num_iterations))
+
+
 def run_grover_example():
     """Run a demonstration of Grover's algorithm."""
     print("=" * 60)
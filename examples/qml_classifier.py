@@ -5,38 +5,43 @@ Demonstrates a quantum machine learning classifier using PennyLane
 and the FPGA simulator, showcasing quantum kernel methods.
 """
 
+import functools
 import numpy as np
+import jax
+import jax.numpy as jnp
 import pennylane as qml
 from sklearn.datasets import make_classification
 from sklearn.model_selection import train_test_split
 from sklearn.svm import SVC
 from sklearn.metrics import accuracy_score
 from pennylane_device import FPGADevice
+from simulator import quantum_gates
+from simulator.fpga_simulator import apply_tensor_op
 
 
-def quantum_kernel(x1, x2, n_qubits=2, n_layers=2):
+@functools.lru_cache(maxsize=8)
+def _get_kernel_qnode(n_qubits, n_layers):
     """
-    Compute quantum kernel between two data points.
-    
-    Uses a parameterized quantum circuit to encode data and compute
-    the overlap between encoded states.
+    Build (once per circuit shape) the FPGA device and the kernel QNode.
     
     Args:
-        x1, x2: Data points
         n_qubits: Number of qubits
         n_layers: Number of encoding layers
         
     Returns:
-        Kernel value
+        Tuple of (device, qnode) where ``qnode(x1, x2)`` returns the
+        probability of |00...0⟩ after the kernel circuit, for data points
+        already scaled to rotation angles by ``_encoding_angles``
     """
-    dev = FPGADevice(wires=n_qubits, use_jax=True)
+    # Kernel values feed an SVM decision, so complex64 amplitudes are ample
+    dev = FPGADevice(wires=n_qubits, use_jax=True, precision='single')
     
     @qml.qnode(dev)
     def kernel_circuit(x1, x2):
         # Encode x1
         for layer in range(n_layers):
             for i in range(n_qubits):
-                qml.RY(x1[i % len(x1)] * np.pi, wires=i)
+                qml.RY(x1[i % len(x1)], wires=i)
                 if i < n_qubits - 1:
                     qml.CNOT(wires=[i, i+1])
         
@@ -45,14 +50,114 @@ def quantum_kernel(x1, x2, n_qubits=2, n_layers=2):
             for i in range(n_qubits - 1, -1, -1):
                 if i < n_qubits - 1:
                     qml.CNOT(wires=[i, i+1])
-                qml.RY(-x2[i % len(x2)] * np.pi, wires=i)
+                qml.RY(-x2[i % len(x2)], wires=i)
         
-        # Measure overlap
-        return qml.probs(wires=list(range(n_qubits)))
+        # Measure overlap: only the |00...0⟩ amplitude is needed, not all probabilities
+        return qml.expval(qml.Projector([0] * n_qubits, wires=range(n_qubits)))
+    
+    return dev, kernel_circuit
+
+
+def _encoding_angles(X):
+    """Scale data to RY encoding angles (x -> πx) once, outside the circuits."""
+    # float32 angles keep the kernel circuit in complex64 even with jax_enable_x64 on
+    return (np.asarray(X) * np.pi).astype(np.float32)
+
+
+def quantum_kernel(x1, x2, n_qubits=2, n_layers=2):
+    """
+    Compute quantum kernel between two data points.
+    
+    Uses a parameterized quantum circuit to encode data and compute
+    the overlap between encoded states.
+    
+    Args:
+        x1, x2: Data points
+        n_qubits: Number of qubits
+        n_layers: Number of encoding layers
+        
+    Returns:
+        Kernel value
+    """
+    _, kernel_circuit = _get_kernel_qnode(n_qubits, n_layers)
     
     # Compute overlap (probability of |00...0⟩)
-    probs = kernel_circuit(x1, x2)
-    return probs[0]  # Return probability of all zeros
+    return kernel_circuit(_encoding_angles(x1), _encoding_angles(x2))
+
+
+def _ry(theta):
+    """RY rotation matrix built from (possibly traced) JAX scalars."""
+    c, s = jnp.cos(theta / 2), jnp.sin(theta / 2)
+    return jnp.stack([jnp.stack([c, -s]), jnp.stack([s, c])]).astype(jnp.complex64)
+
+
+def _kernel_value(x1, x2, n_qubits, n_layers):
+    """
+    Probability of |00...0⟩ after the kernel circuit of ``quantum_kernel``.
+    
+    The same encoding / inverse-encoding gates are folded over a state tensor
+    with the simulator's pure tensor kernels, so the whole circuit is traceable
+    by ``jax.vmap`` and ``jax.jit``. Amplitudes are complex64, as on the
+    single-precision kernel device.
+    """
+    cnot = jnp.asarray(quantum_gates.CNOT(), dtype=jnp.complex64)
+    psi = jnp.zeros((2,) * n_qubits, dtype=jnp.complex64).at[(0,) * n_qubits].set(1.0)
+    
+    # Encode x1
+    for layer in range(n_layers):
+        for i in range(n_qubits):
+            psi = apply_tensor_op(jnp, psi, n_qubits, 'apply_gate', (i,), _ry(x1[i % len(x1)]))
+            if i < n_qubits - 1:
+                psi = apply_tensor_op(jnp, psi, n_qubits, 'apply_gate', (i, i + 1), cnot)
+    
+    # Encode x2 (inverse)
+    for layer in range(n_layers):
+        for i in range(n_qubits - 1, -1, -1):
+            if i < n_qubits - 1:
+                psi = apply_tensor_op(jnp, psi, n_qubits, 'apply_gate', (i, i + 1), cnot)
+            psi = apply_tensor_op(jnp, psi, n_qubits, 'apply_gate', (i,), _ry(-x2[i % len(x2)]))
+    
+    return jnp.abs(psi[(0,) * n_qubits]) ** 2
+
+
+@functools.lru_cache(maxsize=8)
+def _make_kernel_batch(n_qubits, n_layers, num_devices=1):
+    """
+    Compile (once per circuit shape) the kernel circuit vmapped over pairs of data points.
+    
+    With several local devices the vmapped batch is additionally pmapped over a
+    leading device axis, one shard of pairs per device.
+    """
+    kernel = functools.partial(_kernel_value, n_qubits=n_qubits, n_layers=n_layers)
+    batched = jax.vmap(kernel, in_axes=(0, 0))
+    if num_devices > 1:
+        return jax.pmap(batched)
+    return jax.jit(batched)
+
+
+def _kernel_batch(X1, X2, n_qubits=2, n_layers=2):
+    """
+    Kernel values for the pairs ``(X1[k], X2[k])`` in a single batched circuit execution.
+    
+    Args:
+        X1, X2: Paired encoding angles from ``_encoding_angles``, each of
+            shape (n_pairs, n_features)
+        n_qubits: Number of qubits
+        n_layers: Number of encoding layers
+        
+    Returns:
+        Array of n_pairs kernel values (probability of |00...0⟩)
+    """
+    num_devices = jax.local_device_count()
+    kernel_fn = _make_kernel_batch(n_qubits, n_layers, num_devices)
+    if num_devices == 1:
+        return np.asarray(kernel_fn(jnp.asarray(X1), jnp.asarray(X2)))
+    
+    # Pad the pairs to whole shards and split them across devices
+    n_pairs = len(X1)
+    shards = np.arange(-(-n_pairs // num_devices) * num_devices).reshape(num_devices, -1) % n_pairs
+    kernel_vals = kernel_fn(jnp.asarray(X1[shards]), jnp.asarray(X2[shards]))
+    return np.asarray(kernel_vals).reshape(-1)[:n_pairs]
 
 
 def create_quantum_kernel_matrix(X, n_qubits=2, n_layers=2):
@@ -71,13 +176,12 @@ def create_quantum_kernel_matrix(X, n_qubits=2, n_layers=2):
     kernel_matrix = np.zeros((n_samples, n_samples))
     
     print("Computing quantum kernel matrix...")
-    for i in range(n_samples):
-        if (i + 1) % 10 == 0:
-            print(f"  Processed {i+1}/{n_samples} samples")
-        for j in range(i, n_samples):
-            kernel_val = quantum_kernel(X[i], X[j], n_qubits, n_layers)
-            kernel_matrix[i, j] = kernel_val
-            kernel_matrix[j, i] = kernel_val
+    # The kernel is symmetric: evaluate the n(n+1)/2 upper-triangle pairs in one batch
+    angles = _encoding_angles(X)
+    idx_i, idx_j = np.triu_indices(n_samples)
+    kernel_vals = _kernel_batch(angles[idx_i], angles[idx_j], n_qubits, n_layers)
+    kernel_matrix[idx_i, idx_j] = kernel_vals
+    kernel_matrix[idx_j, idx_i] = kernel_vals
     
     return kernel_matrix
 
@@ -129,12 +233,12 @@ def run_qml_classifier_demo():
     
     # Compute test kernel
     print("\n4. Computing test kernel...")
-    kernel_test = np.zeros((X_test.shape[0], X_train_subset.shape[0]))
-    for i in range(X_test.shape[0]):
-        for j in range(X_train_subset.shape[0]):
-            kernel_test[i, j] = quantum_kernel(
-                X_test[i], X_train_subset[j], n_qubits, n_layers
-            )
+    test_angles = _encoding_angles(X_test)
+    train_angles = _encoding_angles(X_train_subset)
+    idx_i, idx_j = np.indices((X_test.shape[0], X_train_subset.shape[0])).reshape(2, -1)
+    kernel_test = _kernel_batch(
+        test_angles[idx_i], train_angles[idx_j], n_qubits, n_layers
+    ).reshape(X_test.shape[0], X_train_subset.shape[0])
     
     # Predict
     y_pred = svm.predict(kernel_test)
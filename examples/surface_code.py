@@ -67,8 +67,9 @@ def demo_feedback_loop():
     print(f"  Failed corrections:     {results['failed_corrections']}")
     print(f"  Success rate:           {results['success_rate']:.4f}")
     print(f"  Avg decoding time:      {results['avg_decoding_time_us']:.3f} μs")
-    print(f"  Min decoding time:      {results['min_decoding_time_us']:.3f} μs")
-    print(f"  Max decoding time:      {results['max_decoding_time_us']:.3f} μs")
+    if not np.isnan(results['min_decoding_time_us']):  # NaN for batched runs
+        print(f"  Min decoding time:      {results['min_decoding_time_us']:.3f} μs")
+        print(f"  Max decoding time:      {results['max_decoding_time_us']:.3f} μs")
     
     return results
 
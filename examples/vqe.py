@@ -5,11 +5,22 @@ Demonstrates the VQE algorithm for finding ground states of quantum Hamiltonians
 using the FPGA-accelerated simulator.
 """
 
+import functools
+import os
 import numpy as np
+import jax
+import jax.numpy as jnp
 from simulator.circuit import QuantumCircuit
+from simulator.fpga_simulator import apply_tensor_op
 from simulator import quantum_gates
+from jax.experimental import sparse as jsparse
+from scipy import sparse
 from scipy.optimize import minimize
-from typing import Callable, Tuple
+from scipy.sparse.linalg import eigsh
+from typing import Callable, Dict, Optional, Tuple, Union
+
+# Energies and gradients feed L-BFGS-B, which needs double precision
+jax.config.update("jax_enable_x64", True)
 
 
 def create_ansatz(circuit: QuantumCircuit, params: np.ndarray, num_layers: int = 2):
@@ -29,17 +40,16 @@ def create_ansatz(circuit: QuantumCircuit, params: np.ndarray, num_layers: int =
     param_idx = 0
     
     for layer in range(num_layers):
-        # Rotation layer
+        # Rotation layer: RY, RZ, RY on each qubit, fused into one 2x2 gate
         for q in range(num_qubits):
-            if param_idx < len(params):
-                circuit.ry(q, params[param_idx])
-                param_idx += 1
-            if param_idx < len(params):
-                circuit.rz(q, params[param_idx])
-                param_idx += 1
-            if param_idx < len(params):
-                circuit.ry(q, params[param_idx])
-                param_idx += 1
+            angles = params[param_idx:param_idx + 3]
+            param_idx += len(angles)
+            if len(angles) == 0:
+                continue
+            rotation = quantum_gates.I()
+            for gate, angle in zip((quantum_gates.RY, quantum_gates.RZ, quantum_gates.RY), angles):
+                rotation = gate(angle) @ rotation
+            circuit.apply(rotation, q)
         
         # Entangling layer
         if layer < num_layers - 1:  # No entangling after last layer
@@ -47,6 +57,108 @@ def create_ansatz(circuit: QuantumCircuit, params: np.ndarray, num_layers: int =
                 circuit.cnot(q, q + 1)
 
 
+def _ry(theta):
+    """RY rotation matrices, shape ``theta.shape + (2, 2)``, from (possibly traced) angles."""
+    c, s = jnp.cos(theta / 2), jnp.sin(theta / 2)
+    return jnp.stack([jnp.stack([c, -s], -1), jnp.stack([s, c], -1)], -2).astype(jnp.complex128)
+
+
+def _rz(theta):
+    """RZ rotation matrices, shape ``theta.shape + (2, 2)``, from (possibly traced) angles."""
+    phase = jnp.exp(-0.5j * theta)
+    zero = jnp.zeros_like(phase)
+    return jnp.stack([jnp.stack([phase, zero], -1), jnp.stack([zero, jnp.conj(phase)], -1)], -2)
+
+
+def _apply_rotation_layer(psi: jnp.ndarray, ry1_angles: jnp.ndarray, rz_angles: jnp.ndarray,
+                          ry2_angles: jnp.ndarray) -> jnp.ndarray:
+    """
+    Apply RY, RZ, RY to every qubit as one fused 2x2 gate per qubit.
+    
+    Args:
+        psi: State tensor of shape ``(2,) * num_qubits``
+        ry1_angles, rz_angles, ry2_angles: Per-qubit angles, each of shape (num_qubits,)
+        
+    Returns:
+        New state tensor
+    """
+    num_qubits = psi.ndim
+    # All three matrices for all qubits at once: M_q = RY(c) RZ(b) RY(a), shape (n, 2, 2)
+    rotations = _ry(ry2_angles) @ _rz(rz_angles) @ _ry(ry1_angles)
+    for q in range(num_qubits):
+        psi = apply_tensor_op(jnp, psi, num_qubits, 'apply_gate', (q,), rotations[q])
+    return psi
+
+
+def _ansatz_apply(params: jnp.ndarray, num_qubits: int, num_layers: int) -> jnp.ndarray:
+    """
+    Statevector of ``create_ansatz`` applied to |00...0⟩, as a pure JAX function of params.
+    
+    Folds the same gates over a state tensor with the simulator's pure kernels,
+    so the whole ansatz traces into one XLA graph.
+    """
+    cnot = jnp.asarray(quantum_gates.CNOT())
+    psi = jnp.zeros((2,) * num_qubits, dtype=jnp.complex128).at[(0,) * num_qubits].set(1.0)
+    
+    # Missing trailing parameters mean skipped gates, i.e. zero-angle rotations
+    num_angles = 3 * num_qubits * num_layers
+    angles = jnp.zeros(num_angles).at[:len(params)].set(params[:num_angles])
+    angles = angles.reshape(num_layers, num_qubits, 3)
+    
+    for layer in range(num_layers):
+        psi = _apply_rotation_layer(psi, angles[layer, :, 0], angles[layer, :, 1], angles[layer, :, 2])
+        
+        # Entangling layer
+        if layer < num_layers - 1:
+            for q in range(num_qubits - 1):
+                psi = apply_tensor_op(jnp, psi, num_qubits, 'apply_gate', (q, q + 1), cnot)
+    
+    return psi.reshape(-1)
+
+
+@functools.lru_cache(maxsize=32)
+def _vqe_program(num_qubits: int, num_layers: int) -> Tuple[Callable, Callable]:
+    """
+    Compile (once per ansatz shape) the ansatz plus expectation value.
+    
+    The Hamiltonian is a traced argument, so every optimizer step, VQE run and
+    Hamiltonian of the same size reuses the same XLA graph; only the parameters
+    (and H) cross into the compiled function.
+    
+    Args:
+        num_qubits: Number of qubits
+        num_layers: Number of ansatz layers
+        
+    Returns:
+        Tuple of jitted ``energy(params, H) -> <ψ(params)|H|ψ(params)>`` and
+        ``energy_and_grad(params, H)``, its value and gradient in params
+    """
+    def energy(params, hamiltonian):
+        state = _ansatz_apply(params, num_qubits, num_layers)
+        return jnp.real(jnp.vdot(state, hamiltonian @ state))
+    
+    return jax.jit(energy), jax.jit(jax.value_and_grad(energy))
+
+
+def _device_hamiltonian(hamiltonian: Union[np.ndarray, sparse.spmatrix]):
+    """Hamiltonian as a JAX operand: BCOO for sparse input (O(nnz) matvecs), dense otherwise."""
+    if sparse.issparse(hamiltonian):
+        return jsparse.BCOO.from_scipy_sparse(hamiltonian.astype(np.complex128))
+    return jnp.asarray(hamiltonian, dtype=jnp.complex128)
+
+
+def ground_state_energy(hamiltonian: Union[np.ndarray, sparse.spmatrix]) -> float:
+    """
+    Exact ground-state energy, for comparison with VQE.
+    
+    Sparse Hamiltonians use Lanczos (``eigsh``) for the lowest eigenvalue only,
+    which needs nothing but O(nnz) matvecs; dense ones fall back to ``eigvalsh``.
+    """
+    if sparse.issparse(hamiltonian):
+        return float(eigsh(hamiltonian, k=1, which='SA', return_eigenvectors=False)[0])
+    return float(np.linalg.eigvalsh(hamiltonian)[0])
+
+
 def compute_expectation_value(circuit: QuantumCircuit, hamiltonian: np.ndarray) -> float:
     """
     Compute expectation value <ψ|H|ψ>.
@@ -61,38 +173,59 @@ def compute_expectation_value(circuit: QuantumCircuit, hamiltonian: np.ndarray)
     return circuit.get_expectation_value(hamiltonian)
 
 
-def vqe_objective(params: np.ndarray, hamiltonian: np.ndarray, num_qubits: int, 
+def vqe_objective(params: np.ndarray, hamiltonian: Union[np.ndarray, sparse.spmatrix], num_qubits: int, 
                   num_layers: int) -> float:
     """
     Objective function for VQE optimization.
     
     Args:
         params: Variational parameters
-        hamiltonian: Hamiltonian matrix
+        hamiltonian: Hamiltonian matrix (dense or scipy sparse)
         num_qubits: Number of qubits
         num_layers: Number of ansatz layers
         
     Returns:
         Energy (expectation value)
     """
-    circuit = QuantumCircuit(num_qubits, use_jax=True)
-    create_ansatz(circuit, params, num_layers)
-    circuit.execute()
-    
-    energy = compute_expectation_value(circuit, hamiltonian)
-    return energy
+    energy, _ = _vqe_program(num_qubits, num_layers)
+    return float(energy(jnp.asarray(params), _device_hamiltonian(hamiltonian)))
+
+
+# Optimal parameters of earlier runs per (num_qubits, num_layers), keyed by the
+# problem parameters (e.g. (J, h)) they were found for
+_WARM_START_PARAMS: Dict[Tuple[int, int], Dict[Tuple[float, ...], np.ndarray]] = {}
+
 
+def _nearest_warm_start(num_qubits: int, num_layers: int,
+                        warm_start_key: Tuple[float, ...]) -> Optional[np.ndarray]:
+    """Optimal parameters of the cached problem closest to ``warm_start_key``, if any."""
+    cached = _WARM_START_PARAMS.get((num_qubits, num_layers))
+    if not cached:
+        return None
+    nearest = min(cached, key=lambda key: np.linalg.norm(np.subtract(key, warm_start_key)))
+    return cached[nearest].copy()
 
-def run_vqe(hamiltonian: np.ndarray, num_qubits: int, num_layers: int = 2, 
-            initial_params: np.ndarray = None) -> Tuple[float, np.ndarray, dict]:
+
+def run_vqe(hamiltonian: Union[np.ndarray, sparse.spmatrix], num_qubits: int, num_layers: int = 2, 
+            initial_params: np.ndarray = None, warm_start_key: Tuple[float, ...] = None,
+            warm_start_file: str = None) -> Tuple[float, np.ndarray, dict]:
     """
     Run VQE to find ground state energy.
     
+    Without ``initial_params``, the optimizer starts from the optimum of the
+    nearest problem solved earlier in this process (``warm_start_key``), else
+    from the parameters saved in ``warm_start_file``, else at random. Starting
+    near an optimum, L-BFGS-B converges in a handful of steps.
+    
     Args:
-        hamiltonian: Hamiltonian matrix (2^num_qubits × 2^num_qubits)
+        hamiltonian: Hamiltonian matrix (2^num_qubits × 2^num_qubits, dense or scipy sparse)
         num_qubits: Number of qubits
         num_layers: Number of ansatz layers
-        initial_params: Initial parameters (random if None)
+        initial_params: Initial parameters (warm start or random if None)
+        warm_start_key: Problem parameters of this Hamiltonian, e.g. ``(J, h)``;
+            the optimum found is cached under it for later runs
+        warm_start_file: ``.npy`` file to load initial parameters from, and to
+            save the optimal parameters to
         
     Returns:
         Tuple of (ground_energy, optimal_params, optimization_info)
@@ -101,21 +234,40 @@ def run_vqe(hamiltonian: np.ndarray, num_qubits: int, num_layers: int = 2,
     params_per_layer = 3 * num_qubits
     num_params = num_layers * params_per_layer
     
+    if initial_params is None and warm_start_key is not None:
+        initial_params = _nearest_warm_start(num_qubits, num_layers, warm_start_key)
+    if initial_params is None and warm_start_file is not None and os.path.exists(warm_start_file):
+        saved = np.load(warm_start_file)
+        if saved.shape == (num_params,):
+            initial_params = saved
     if initial_params is None:
         initial_params = np.random.uniform(0, 2 * np.pi, num_params)
     
-    # Optimize
+    # Optimize one compiled energy function, with its gradient from reverse-mode
+    # autodiff instead of 2 * num_params finite-difference evaluations per step.
+    # Energy and gradient come out of a single call (jac=True).
+    _, energy_and_grad = _vqe_program(num_qubits, num_layers)
+    H = _device_hamiltonian(hamiltonian)
+    
+    def objective(params):
+        energy, grad = energy_and_grad(jnp.asarray(params), H)
+        return float(energy), np.asarray(grad)
+    
     result = minimize(
-        vqe_objective,
+        objective,
         initial_params,
-        args=(hamiltonian, num_qubits, num_layers),
+        jac=True,
         method='L-BFGS-B',
         options={'maxiter': 100}
     )
     
+    if warm_start_key is not None:
+        _WARM_START_PARAMS.setdefault((num_qubits, num_layers), {})[tuple(warm_start_key)] = result.x.copy()
+    if warm_start_file is not None:
+        np.save(warm_start_file, result.x)
+    
     # Get exact ground state for comparison
-    eigenvals, eigenvecs = np.linalg.eigh(hamiltonian)
-    exact_ground_energy = eigenvals[0]
+    exact_ground_energy = ground_state_energy(hamiltonian)
     
     return result.fun, result.x, {
         'exact_energy': exact_ground_energy,
@@ -124,73 +276,69 @@ def run_vqe(hamiltonian: np.ndarray, num_qubits: int, num_layers: int = 2,
     }
 
 
-def create_heisenberg_hamiltonian(num_qubits: int, J: float = 1.0, h: float = 0.5) -> np.ndarray:
+def _parity(values: np.ndarray) -> np.ndarray:
+    """Parity (popcount mod 2) of each non-negative integer below 2**32."""
+    values = values.copy()
+    for shift in (16, 8, 4, 2, 1):
+        values ^= values >> shift
+    return values & 1
+
+
+def pauli_string_matrix(num_qubits: int, x_mask: int, z_mask: int) -> sparse.csr_matrix:
+    """
+    Sparse matrix of the Pauli string with X on ``x_mask`` and Z on ``z_mask`` bits.
+    
+    Qubit q is bit q of the basis-state index; a qubit in both masks carries Y.
+    Writing P = i^{#Y} X^x Z^z, row r has its single nonzero in column r ^ x_mask
+    with value i^{#Y} (-1)^{popcount((r ^ x_mask) & z_mask)}, so the CSR arrays are
+    filled directly in one vectorized pass.
+    
+    Args:
+        num_qubits: Number of qubits
+        x_mask: Bitmask of qubits carrying X or Y
+        z_mask: Bitmask of qubits carrying Z or Y
+        
+    Returns:
+        Pauli string as a (2^num_qubits × 2^num_qubits) CSR matrix
+    """
+    dim = 1 << num_qubits
+    rows = np.arange(dim, dtype=np.int64)
+    cols = rows ^ x_mask
+    phase = 1j ** bin(x_mask & z_mask).count("1")
+    data = phase * (1 - 2 * _parity(cols & z_mask))
+    return sparse.csr_matrix((data.astype(np.complex128), cols, np.arange(dim + 1)), shape=(dim, dim))
+
+
+def create_heisenberg_hamiltonian(num_qubits: int, J: float = 1.0, h: float = 0.5) -> sparse.csr_matrix:
     """
     Create a Heisenberg model Hamiltonian.
     
     H = -J Σ (X_i X_{i+1} + Y_i Y_{i+1} + Z_i Z_{i+1}) - h Σ Z_i
     
+    Each Pauli term is assembled sparse (one nonzero per row) and summed
+    sparse, instead of as a chain of dense Kronecker products.
+    
     Args:
         num_qubits: Number of qubits
         J: Coupling strength
         h: Magnetic field strength
         
     Returns:
-        Hamiltonian matrix
+        Hamiltonian as a sparse CSR matrix
     """
     dim = 2 ** num_qubits
-    hamiltonian = np.zeros((dim, dim), dtype=np.complex128)
-    
-    # Pauli matrices
-    X = quantum_gates.X()
-    Y = quantum_gates.Y()
-    Z = quantum_gates.Z()
-    I = quantum_gates.I()
+    hamiltonian = sparse.csr_matrix((dim, dim), dtype=np.complex128)
     
     # Interaction terms
     for i in range(num_qubits - 1):
-        # XX term
-        xx_term = I
-        for j in range(num_qubits):
-            if j == i:
-                xx_term = np.kron(xx_term, X)
-            elif j == i + 1:
-                xx_term = np.kron(xx_term, X)
-            else:
-                xx_term = np.kron(xx_term, I)
-        hamiltonian -= J * xx_term
-        
-        # YY term
-        yy_term = I
-        for j in range(num_qubits):
-            if j == i:
-                yy_term = np.kron(yy_term, Y)
-            elif j == i + 1:
-                yy_term = np.kron(yy_term, Y)
-            else:
-                yy_term = np.kron(yy_term, I)
-        hamiltonian -= J * yy_term
-        
-        # ZZ term
-        zz_term = I
-        for j in range(num_qubits):
-            if j == i:
-                zz_term = np.kron(zz_term, Z)
-            elif j == i + 1:
-                zz_term = np.kron(zz_term, Z)
-            else:
-                zz_term = np.kron(zz_term, I)
-        hamiltonian -= J * zz_term
+        pair = (1 << i) | (1 << (i + 1))
+        hamiltonian -= J * pauli_string_matrix(num_qubits, pair, 0)     # XX
+        hamiltonian -= J * pauli_string_matrix(num_qubits, pair, pair)  # YY
+        hamiltonian -= J * pauli_string_matrix(num_qubits, 0, pair)     # ZZ
     
     # Magnetic field terms
     for i in range(num_qubits):
-        z_term = I
-        for j in range(num_qubits):
-            if j == i:
-                z_term = np.kron(z_term, Z)
-            else:
-                z_term = np.kron(z_term, I)
-        hamiltonian -= h * z_term
+        hamiltonian -= h * pauli_string_matrix(num_qubits, 0, 1 << i)
     
     return hamiltonian
 
@@ -212,8 +360,7 @@ def run_vqe_example():
     hamiltonian = create_heisenberg_hamiltonian(num_qubits, J=1.0, h=0.5)
     
     # Get exact ground state
-    eigenvals, eigenvecs = np.linalg.eigh(hamiltonian)
-    exact_energy = eigenvals[0]
+    exact_energy = ground_state_energy(hamiltonian)
     print(f"\nExact ground state energy: {exact_energy:.6f}")
     
     # Run VQE
@@ -239,6 +386,18 @@ def run_vqe_example():
     for i, amp in enumerate(final_state):
         print(f"  |{i:0{num_qubits}b}⟩: {amp:.4f}")
     
+    # Sweep the field, warm-starting each run from the nearest solved one
+    print("\nWarm-started field sweep:")
+    for h in (0.5, 0.6, 0.7, 0.8):
+        energy, _, sweep_info = run_vqe(
+            create_heisenberg_hamiltonian(num_qubits, J=1.0, h=h),
+            num_qubits,
+            num_layers=num_layers,
+            warm_start_key=(1.0, h)
+        )
+        print(f"  h={h:.1f}: E={energy:.6f} (exact {sweep_info['exact_energy']:.6f}), "
+              f"{sweep_info['iterations']} iterations")
+    
     return vqe_energy, optimal_params, info
 
 
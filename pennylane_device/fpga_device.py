@@ -6,13 +6,65 @@ simulator as the backend. This enables seamless integration with PennyLane's
 quantum computing ecosystem.
 """
 
+import functools
 import numpy as np
+import jax
+import jax.numpy as jnp
 import pennylane as qml
+from scipy import sparse
 from typing import Sequence, Union
-from simulator.circuit import QuantumCircuit
+from simulator.circuit import PROGRAM_GATES, QuantumCircuit
 from simulator import quantum_gates
 
 
+# Constant 2x2 matrices of the single-qubit observables
+_SINGLE_QUBIT_OBSERVABLES = {
+    "PauliX": quantum_gates.X,
+    "PauliY": quantum_gates.Y,
+    "PauliZ": quantum_gates.Z,
+    "Identity": quantum_gates.I,
+    "Hadamard": quantum_gates.H,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _single_qubit_obs_matrix(op_name: str) -> np.ndarray:
+    """Read-only 2x2 matrix of a named single-qubit observable."""
+    op = _SINGLE_QUBIT_OBSERVABLES[op_name]()
+    op.setflags(write=False)
+    return op
+
+
+@functools.lru_cache(maxsize=256)
+def _expand_to_full(op_name: str, wire: int, num_qubits: int) -> sparse.csr_matrix:
+    """
+    Expand a named single-qubit observable on ``wire`` to the full Hilbert space.
+    
+    Qubit q is bit q of the basis-state index, so the operator is
+    I_{2^(n-wire-1)} ⊗ P ⊗ I_{2^wire}: two sparse Kronecker products with
+    identity blocks, O(2^n) nonzeros instead of a dense 4^n matrix. Cached,
+    since the same observable on the same wire is requested on every ``expval``.
+    """
+    dim_right = 1 << wire
+    dim_left = 1 << (num_qubits - wire - 1)
+    full_op = sparse.kron(sparse.kron(sparse.identity(dim_left), _single_qubit_obs_matrix(op_name)),
+                          sparse.identity(dim_right), format='csr')
+    full_op.data.setflags(write=False)
+    return full_op
+
+
+# PennyLane primitive gates translated straight into QuantumCircuit program ops
+_PROGRAM_OPS = {
+    "PauliX": 'x', "PauliY": 'y', "PauliZ": 'z', "Hadamard": 'h',
+    "S": 's', "T": 't', "CNOT": 'cnot', "CZ": 'cz', "SWAP": 'swap',
+    "RX": 'rx', "RY": 'ry', "RZ": 'rz',
+    # PhaseShift(phi) = RZ(phi)
+    "PhaseShift": 'rz',
+    "CRX": 'crx', "CRY": 'cry', "CRZ": 'crz',
+}
+_PROGRAM_OP_IDS = {name: PROGRAM_GATES.index(gate) for name, gate in _PROGRAM_OPS.items()}
+
+
 class FPGADevice(qml.Device):
     """
     PennyLane device using the FPGA-accelerated quantum simulator.
@@ -40,7 +92,7 @@ class FPGADevice(qml.Device):
         "Hermitian", "Projector"
     }
     
-    def __init__(self, wires, shots=None, use_jax=True, **kwargs):
+    def __init__(self, wires, shots=None, use_jax=True, precision='double', **kwargs):
         """
         Initialize the FPGA device.
         
@@ -48,6 +100,7 @@ class FPGADevice(qml.Device):
             wires: Number of wires (qubits) or list of wire labels
             shots: Number of shots for measurements (None for exact statevector)
             use_jax: Whether to use JAX acceleration
+            precision: Statevector precision, 'double' (complex128) or 'single' (complex64)
             **kwargs: Additional arguments
         """
         if isinstance(wires, int):
@@ -61,12 +114,15 @@ class FPGADevice(qml.Device):
         
         self.num_qubits = len(wires)
         self.use_jax = use_jax
+        self.precision = precision
         self.circuit = None
+        self._cdf = None  # Reused cumulative-probability buffer for sampling
         self.reset()
     
     def reset(self):
         """Reset the device."""
-        self.circuit = QuantumCircuit(self.num_qubits, use_jax=self.use_jax)
+        self.circuit = QuantumCircuit(self.num_qubits, use_jax=self.use_jax,
+                                      precision=self.precision)
     
     def _wire_to_index(self, wire):
         """Convert wire label to qubit index."""
@@ -86,103 +142,130 @@ class FPGADevice(qml.Device):
             rotations: List of rotations for observables
             **kwargs: Additional arguments
         """
+        # Runs of primitive gates go to the circuit as one program; composite
+        # decompositions are applied one by one in between
+        program = []
         for op in operations:
-            self._apply_operation(op)
+            if op.name in _PROGRAM_OP_IDS:
+                program.append(op)
+            else:
+                self._apply_program(program)
+                program = []
+                self._apply_operation(op)
+        self._apply_program(program)
+    
+    def _apply_program(self, operations):
+        """Translate primitive operations into (op_ids, wires, params) and append them at once."""
+        if not operations:
+            return
+        op_ids = np.array([_PROGRAM_OP_IDS[op.name] for op in operations], dtype=np.int32)
+        wires = np.zeros((len(operations), 2), dtype=np.int32)
+        params = np.zeros(len(operations))
+        for k, op in enumerate(operations):
+            op_wires = [self._wire_to_index(w) for w in op.wires]
+            wires[k, :len(op_wires)] = op_wires
+            if op.parameters:
+                params[k] = op.parameters[0]
+        self.circuit.apply_program(op_ids, wires, params)
     
     def _apply_operation(self, operation):
         """Apply a single operation to the circuit."""
-        op_name = operation.name
         wires = [self._wire_to_index(w) for w in operation.wires]
         
-        # Map PennyLane operations to our gates
-        if op_name == "PauliX":
-            self.circuit.x(wires[0])
-        elif op_name == "PauliY":
-            self.circuit.y(wires[0])
-        elif op_name == "PauliZ":
-            self.circuit.z(wires[0])
-        elif op_name == "Hadamard":
-            self.circuit.h(wires[0])
-        elif op_name == "S":
-            self.circuit.apply(quantum_gates.S, wires[0])
-        elif op_name == "T":
-            self.circuit.apply(quantum_gates.T, wires[0])
-        elif op_name == "SX":
-            # SX = (X + Y) / sqrt(2)
-            self.circuit.apply(quantum_gates.S, wires[0])
-            self.circuit.h(wires[0])
-            self.circuit.apply(quantum_gates.S, wires[0])
-        elif op_name == "CNOT":
-            self.circuit.cnot(wires[0], wires[1])
-        elif op_name == "CZ":
-            self.circuit.cz(wires[0], wires[1])
-        elif op_name == "SWAP":
-            self.circuit.swap(wires[0], wires[1])
-        elif op_name == "RX":
-            self.circuit.rx(wires[0], operation.parameters[0])
-        elif op_name == "RY":
-            self.circuit.ry(wires[0], operation.parameters[0])
-        elif op_name == "RZ":
-            self.circuit.rz(wires[0], operation.parameters[0])
-        elif op_name == "PhaseShift":
-            # PhaseShift(phi) = RZ(phi)
-            self.circuit.rz(wires[0], operation.parameters[0])
-        elif op_name == "CRX":
-            self.circuit.crx(wires[0], wires[1], operation.parameters[0])
-        elif op_name == "CRY":
-            self.circuit.cry(wires[0], wires[1], operation.parameters[0])
-        elif op_name == "CRZ":
-            self.circuit.crz(wires[0], wires[1], operation.parameters[0])
-        elif op_name == "Rot":
-            # Rot(phi, theta, omega) = RZ(omega) RY(theta) RZ(phi)
-            phi, theta, omega = operation.parameters
-            self.circuit.rz(wires[0], phi)
-            self.circuit.ry(wires[0], theta)
-            self.circuit.rz(wires[0], omega)
-        elif op_name == "CRot":
-            # Controlled rotation
-            phi, theta, omega = operation.parameters
-            self.circuit.rz(wires[1], phi)
-            self.circuit.cry(wires[0], wires[1], theta)
-            self.circuit.rz(wires[1], omega)
-        elif op_name == "MultiRZ":
-            # MultiRZ(theta) = exp(-i*theta/2 * Z1 ⊗ Z2 ⊗ ...)
-            theta = operation.parameters[0]
-            # For 2 qubits: apply CZ then phase
-            if len(wires) == 2:
-                self.circuit.rz(wires[0], theta / 2)
-                self.circuit.cnot(wires[0], wires[1])
-                self.circuit.rz(wires[1], -theta / 2)
-                self.circuit.cnot(wires[0], wires[1])
-                self.circuit.rz(wires[0], theta / 2)
-        elif op_name == "IsingXX":
-            # IsingXX(phi) = exp(-i*phi/2 * X ⊗ X)
-            phi = operation.parameters[0]
-            self.circuit.h(wires[0])
-            self.circuit.h(wires[1])
-            self.circuit.cnot(wires[0], wires[1])
-            self.circuit.rz(wires[1], -phi)
-            self.circuit.cnot(wires[0], wires[1])
-            self.circuit.h(wires[0])
-            self.circuit.h(wires[1])
-        elif op_name == "IsingYY":
-            # IsingYY(phi) = exp(-i*phi/2 * Y ⊗ Y)
-            phi = operation.parameters[0]
-            self.circuit.ry(wires[0], -np.pi / 2)
-            self.circuit.ry(wires[1], -np.pi / 2)
-            self.circuit.cnot(wires[0], wires[1])
-            self.circuit.rz(wires[1], -phi)
-            self.circuit.cnot(wires[0], wires[1])
-            self.circuit.ry(wires[0], np.pi / 2)
-            self.circuit.ry(wires[1], np.pi / 2)
-        elif op_name == "IsingZZ":
-            # IsingZZ(phi) = exp(-i*phi/2 * Z ⊗ Z)
-            phi = operation.parameters[0]
+        # Map PennyLane operations to our gates with one dict lookup
+        try:
+            apply = self._OP_DISPATCH[operation.name]
+        except KeyError:
+            raise NotImplementedError(f"Operation {operation.name} not implemented") from None
+        apply(self, operation, wires)
+    
+    def _apply_sx(self, operation, wires):
+        # SX = (X + Y) / sqrt(2)
+        self.circuit.apply(quantum_gates.S, wires[0])
+        self.circuit.h(wires[0])
+        self.circuit.apply(quantum_gates.S, wires[0])
+    
+    def _apply_rot(self, operation, wires):
+        # Rot(phi, theta, omega) = RZ(omega) RY(theta) RZ(phi)
+        phi, theta, omega = operation.parameters
+        self.circuit.rz(wires[0], phi)
+        self.circuit.ry(wires[0], theta)
+        self.circuit.rz(wires[0], omega)
+    
+    def _apply_crot(self, operation, wires):
+        # Controlled rotation
+        phi, theta, omega = operation.parameters
+        self.circuit.rz(wires[1], phi)
+        self.circuit.cry(wires[0], wires[1], theta)
+        self.circuit.rz(wires[1], omega)
+    
+    def _apply_multi_rz(self, operation, wires):
+        # MultiRZ(theta) = exp(-i*theta/2 * Z1 ⊗ Z2 ⊗ ...)
+        theta = operation.parameters[0]
+        # For 2 qubits: apply CZ then phase
+        if len(wires) == 2:
+            self.circuit.rz(wires[0], theta / 2)
             self.circuit.cnot(wires[0], wires[1])
-            self.circuit.rz(wires[1], -phi)
+            self.circuit.rz(wires[1], -theta / 2)
             self.circuit.cnot(wires[0], wires[1])
-        else:
-            raise NotImplementedError(f"Operation {op_name} not implemented")
+            self.circuit.rz(wires[0], theta / 2)
+    
+    def _apply_ising_xx(self, operation, wires):
+        # IsingXX(phi) = exp(-i*phi/2 * X ⊗ X)
+        phi = operation.parameters[0]
+        self.circuit.h(wires[0])
+        self.circuit.h(wires[1])
+        self.circuit.cnot(wires[0], wires[1])
+        self.circuit.rz(wires[1], -phi)
+        self.circuit.cnot(wires[0], wires[1])
+        self.circuit.h(wires[0])
+        self.circuit.h(wires[1])
+    
+    def _apply_ising_yy(self, operation, wires):
+        # IsingYY(phi) = exp(-i*phi/2 * Y ⊗ Y)
+        phi = operation.parameters[0]
+        self.circuit.ry(wires[0], -np.pi / 2)
+        self.circuit.ry(wires[1], -np.pi / 2)
+        self.circuit.cnot(wires[0], wires[1])
+        self.circuit.rz(wires[1], -phi)
+        self.circuit.cnot(wires[0], wires[1])
+        self.circuit.ry(wires[0], np.pi / 2)
+        self.circuit.ry(wires[1], np.pi / 2)
+    
+    def _apply_ising_zz(self, operation, wires):
+        # IsingZZ(phi) = exp(-i*phi/2 * Z ⊗ Z)
+        phi = operation.parameters[0]
+        self.circuit.cnot(wires[0], wires[1])
+        self.circuit.rz(wires[1], -phi)
+        self.circuit.cnot(wires[0], wires[1])
+    
+    # Operation name -> applier(self, operation, wires)
+    _OP_DISPATCH = {
+        "PauliX": lambda self, op, w: self.circuit.x(w[0]),
+        "PauliY": lambda self, op, w: self.circuit.y(w[0]),
+        "PauliZ": lambda self, op, w: self.circuit.z(w[0]),
+        "Hadamard": lambda self, op, w: self.circuit.h(w[0]),
+        "S": lambda self, op, w: self.circuit.apply(quantum_gates.S, w[0]),
+        "T": lambda self, op, w: self.circuit.apply(quantum_gates.T, w[0]),
+        "SX": _apply_sx,
+        "CNOT": lambda self, op, w: self.circuit.cnot(w[0], w[1]),
+        "CZ": lambda self, op, w: self.circuit.cz(w[0], w[1]),
+        "SWAP": lambda self, op, w: self.circuit.swap(w[0], w[1]),
+        "RX": lambda self, op, w: self.circuit.rx(w[0], op.parameters[0]),
+        "RY": lambda self, op, w: self.circuit.ry(w[0], op.parameters[0]),
+        "RZ": lambda self, op, w: self.circuit.rz(w[0], op.parameters[0]),
+        # PhaseShift(phi) = RZ(phi)
+        "PhaseShift": lambda self, op, w: self.circuit.rz(w[0], op.parameters[0]),
+        "CRX": lambda self, op, w: self.circuit.crx(w[0], w[1], op.parameters[0]),
+        "CRY": lambda self, op, w: self.circuit.cry(w[0], w[1], op.parameters[0]),
+        "CRZ": lambda self, op, w: self.circuit.crz(w[0], w[1], op.parameters[0]),
+        "Rot": _apply_rot,
+        "CRot": _apply_crot,
+        "MultiRZ": _apply_multi_rz,
+        "IsingXX": _apply_ising_xx,
+        "IsingYY": _apply_ising_yy,
+        "IsingZZ": _apply_ising_zz,
+    }
     
     def execute(self, circuit, **kwargs):
         """
@@ -201,12 +284,31 @@ class FPGADevice(qml.Device):
         # Get measurement results
         if self.shots is None:
             # Return statevector
-            return self.circuit.get_statevector()
+            return self.circuit.simulator.to_numpy()
         else:
-            # Sample from probabilities
-            probs = self.circuit.get_probabilities()
-            samples = np.random.choice(len(probs), size=self.shots, p=probs)
-            return samples
+            return self._sample_basis_states()
+    
+    def _sample_basis_states(self) -> np.ndarray:
+        """
+        Draw ``shots`` basis-state indices from the current state.
+        
+        JAX states are sampled on device with ``jax.random.categorical``; NumPy
+        states invert the CDF with one ``searchsorted`` over uniform draws,
+        accumulating into a buffer reused across executions.
+        """
+        simulator = self.circuit.simulator
+        if simulator.use_jax:
+            # Key drawn from NumPy's global RNG, so np.random.seed still applies
+            key = jax.random.PRNGKey(np.random.randint(2 ** 31))
+            logits = jnp.log(jnp.abs(simulator.statevector) ** 2)
+            return np.asarray(jax.random.categorical(key, logits, shape=(self.shots,)))
+        
+        probs = self.circuit.get_probabilities()
+        if self._cdf is None or self._cdf.shape != probs.shape:
+            self._cdf = np.empty_like(probs)
+        cdf = np.cumsum(probs, out=self._cdf)
+        # Scaling the draws by the total absorbs rounding in the normalization
+        return np.searchsorted(cdf, np.random.random(self.shots) * cdf[-1], side='right')
     
     def expval(self, observable, **kwargs):
         """
@@ -222,6 +324,18 @@ class FPGADevice(qml.Device):
         # Execute circuit first
         self.circuit.execute()
         
+        # Single-wire observables contract into one statevector axis
+        if isinstance(observable, qml.operation.Observable) and len(observable.wires) == 1:
+            if observable.name in _SINGLE_QUBIT_OBSERVABLES:
+                op = _single_qubit_obs_matrix(observable.name)
+            elif observable.name == "Hermitian":
+                op = observable.parameters[0]
+            else:
+                op = None
+            if op is not None:
+                wire = self._wire_to_index(observable.wires[0])
+                return self.circuit.expval_single_qubit(op, wire)
+        
         # Get observable matrix
         if isinstance(observable, qml.operation.Observable):
             obs_matrix = self._get_observable_matrix(observable)
@@ -235,39 +349,21 @@ class FPGADevice(qml.Device):
         op_name = observable.name
         wires = [self._wire_to_index(w) for w in observable.wires]
         
-        if op_name == "PauliX":
-            op = quantum_gates.X()
-        elif op_name == "PauliY":
-            op = quantum_gates.Y()
-        elif op_name == "PauliZ":
-            op = quantum_gates.Z()
-        elif op_name == "Identity":
-            op = quantum_gates.I()
-        elif op_name == "Hadamard":
-            op = quantum_gates.H()
+        if op_name in _SINGLE_QUBIT_OBSERVABLES:
+            return _expand_to_full(op_name, wires[0], self.num_qubits)
         elif op_name == "Hermitian":
             op = observable.parameters[0]
         elif op_name == "Projector":
-            # Projector onto specific state
+            # Projector onto a basis state, given as one bit per wire (wire q is bit q)
             state = observable.parameters[0]
+            index = sum(int(bit) << wire for bit, wire in zip(state, wires))
             dim = 2 ** len(wires)
             op = np.zeros((dim, dim), dtype=np.complex128)
-            op[state, state] = 1.0
+            op[index, index] = 1.0
         else:
             raise NotImplementedError(f"Observable {op_name} not implemented")
         
-        # Expand to full Hilbert space if needed
-        if len(wires) == 1 and self.num_qubits > 1:
-            # Tensor product with identities
-            full_op = quantum_gates.I()
-            for i in range(self.num_qubits):
-                if i == wires[0]:
-                    full_op = np.kron(full_op, op)
-                else:
-                    full_op = np.kron(full_op, quantum_gates.I())
-            return full_op
-        else:
-            return op
+        return op
     
     def var(self, observable, **kwargs):
         """Compute variance of an observable."""
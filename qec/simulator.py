@@ -5,8 +5,90 @@ Simulates quantum errors and stabilizer measurements for testing QEC decoders.
 """
 
 import numpy as np
-from typing import List, Tuple, Dict, Optional
-import random
+from typing import List, Tuple, Dict, Optional, Union
+from .decoder import Correction
+
+# Numba is optional: it compiles the syndrome kernel to native code when present
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Steane code stabilizer supports (the X and Z generators act on the same qubits)
+STEANE_STABILIZERS = [
+    [0, 1, 2, 3],
+    [0, 1, 4, 5],
+    [0, 2, 4, 6],
+]
+
+# The same supports as bitmasks over the 7 qubits
+STEANE_STABILIZER_MASKS = (0x0F, 0x33, 0x55)
+
+
+def _parity(v: np.ndarray) -> np.ndarray:
+    """Bit parity of each element of a uint64 array, as uint64 0/1."""
+    if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+        return (np.bitwise_count(v) & 1).astype(np.uint64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        v = v ^ (v >> np.uint64(shift))
+    return v & np.uint64(1)
+
+
+def steane_syndrome(err_x: int, err_z: int) -> int:
+    """
+    Packed 6-bit Steane syndrome of X and Z error bitmasks.
+    
+    Bit i (i < 3) is the parity of ``err_x`` under stabilizer i and bit 3 + i
+    that of ``err_z``: the packing SteaneDecoder indexes its tables with.
+    """
+    syndrome = 0
+    for i in range(6):
+        v = (err_x if i < 3 else err_z) & STEANE_STABILIZER_MASKS[i % 3]
+        # Fold the 7-bit overlap down to its parity
+        v ^= v >> 4
+        v ^= v >> 2
+        v ^= v >> 1
+        syndrome |= (v & 1) << i
+    return syndrome
+
+
+if NUMBA_AVAILABLE:
+    steane_syndrome = njit(cache=True)(steane_syndrome)
+
+
+def _qubits_to_mask(qubits: List[int]) -> int:
+    """Pack qubit indices into an integer bitmask (bit q = qubit q)."""
+    mask = 0
+    for q in qubits:
+        mask |= 1 << q
+    return mask
+
+
+def _mask_to_qubits(mask: int) -> List[int]:
+    """Unpack an integer bitmask into sorted qubit indices."""
+    qubits = []
+    while mask:
+        # Peel off the lowest set bit: work scales with the error count, not the code size
+        lowest = mask & -mask
+        qubits.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return qubits
+
+
+def _unpack_bits(value: int, count: int) -> List[int]:
+    """The low ``count`` bits of ``value`` as a 0/1 list, least significant first."""
+    return [(value >> i) & 1 for i in range(count)]
+
+
+def _pack_masks(bits: np.ndarray) -> List[int]:
+    """Pack each row of a 0/1 array (column q = qubit q) into an integer bitmask."""
+    if bits.shape[-1] <= 64:
+        weights = np.uint64(1) << np.arange(bits.shape[-1], dtype=np.uint64)
+        return (bits.astype(np.uint64) @ weights).tolist()
+    packed = np.packbits(bits, axis=-1, bitorder='little')
+    return [int.from_bytes(row.tobytes(), 'little') for row in packed]
 
 
 class ErrorSimulator:
@@ -16,8 +98,11 @@ class ErrorSimulator:
     This simulates the noise process and syndrome extraction for QEC codes.
     """
     
+    # Cycles of errors drawn per vectorized draw, amortizing NumPy call overhead
+    ERROR_BLOCK_SIZE = 1024
+    
     def __init__(self, code_type: str = "steane", code_size: int = 7, 
-                 error_rate: float = 0.1):
+                 error_rate: float = 0.1, seed: Optional[int] = None):
         """
         Initialize error simulator.
         
@@ -25,25 +110,59 @@ class ErrorSimulator:
             code_type: Type of code ("steane" or "surface")
             code_size: Size of the code
             error_rate: Probability of error per qubit
+            seed: Seed for the simulator's random generator
         """
         self.code_type = code_type
         self.code_size = code_size
         self.error_rate = error_rate
+        self.rng = np.random.default_rng(seed)
         
         if code_type == "steane":
             self.num_qubits = 7
             self.num_x_stabilizers = 3
             self.num_z_stabilizers = 3
+            self.x_stab_masks = list(STEANE_STABILIZER_MASKS)
+            self.z_stab_masks = list(STEANE_STABILIZER_MASKS)
+            # Compile (or load) the syndrome kernel now, not inside a timed cycle
+            steane_syndrome(0, 0)
         elif code_type == "surface":
             self.num_qubits = code_size * code_size
             # Simplified: assume square code
             self.num_x_stabilizers = (code_size - 1) ** 2
             self.num_z_stabilizers = (code_size - 1) ** 2
+            # Simplified rule: an error on qubit q < num_stabilizers flags stabilizer q
+            self.x_stab_masks = [1 << q for q in range(self.num_x_stabilizers)]
+            self.z_stab_masks = [1 << q for q in range(self.num_z_stabilizers)]
         else:
             raise ValueError(f"Unknown code type: {code_type}")
         
-        # Track current errors
-        self.errors = {'x': [], 'z': []}
+        # Track current errors as bitmasks (bit q = error on qubit q); Python
+        # ints, so codes wider than 64 qubits need no special casing
+        self.err_x = 0
+        self.err_z = 0
+        self._clear_error_block()
+    
+    @property
+    def errors(self) -> Dict[str, List[int]]:
+        """Current errors as lists of qubits, keyed by 'x' and 'z'."""
+        return {'x': _mask_to_qubits(self.err_x), 'z': _mask_to_qubits(self.err_z)}
+    
+    @errors.setter
+    def errors(self, errors: Dict[str, List[int]]):
+        self.err_x = _qubits_to_mask(errors.get('x', []))
+        self.err_z = _qubits_to_mask(errors.get('z', []))
+    
+    @property
+    def error_array(self) -> np.ndarray:
+        """Current errors as a (2, num_qubits) 0/1 uint8 array: X errors in row 0, Z in row 1."""
+        num_bytes = (self.num_qubits + 7) // 8
+        packed = np.frombuffer(self.err_x.to_bytes(num_bytes, 'little')
+                               + self.err_z.to_bytes(num_bytes, 'little'), dtype=np.uint8)
+        return np.unpackbits(packed.reshape(2, num_bytes), axis=1, count=self.num_qubits, bitorder='little')
+    
+    @error_array.setter
+    def error_array(self, errors: np.ndarray):
+        self.err_x, self.err_z = _pack_masks(np.asarray(errors, dtype=bool))
     
     def introduce_errors(self) -> Dict[str, List[int]]:
         """
@@ -52,111 +171,187 @@ class ErrorSimulator:
         Returns:
             Dictionary with 'x' and 'z' keys listing qubits with errors
         """
-        errors = {'x': [], 'z': []}
+        self._next_errors()
+        return self.errors
+    
+    def sample_and_measure(self) -> Tuple[int, int, int, int]:
+        """
+        Introduce random errors and measure their syndrome in one step.
         
-        for qubit in range(self.num_qubits):
-            # Random X error
-            if random.random() < self.error_rate:
-                errors['x'].append(qubit)
-            
-            # Random Z error
-            if random.random() < self.error_rate:
-                errors['z'].append(qubit)
+        Fused form of ``introduce_errors`` followed by ``measure_syndrome``
+        that stays on bitmasks, building no per-qubit or per-stabilizer lists.
         
-        self.errors = errors
-        return errors
+        Returns:
+            Tuple of (syndrome_x, syndrome_z, err_x, err_z) as integers: syndrome
+            bit i is stabilizer i, error bit q is qubit q
+        """
+        self._next_errors()
+        syndrome_x, syndrome_z = self.measure_syndrome_packed()
+        return syndrome_x, syndrome_z, self.err_x, self.err_z
     
-    def measure_syndrome(self) -> Tuple[List[int], List[int]]:
+    def _next_errors(self):
+        """Load the next pre-drawn cycle of errors into ``err_x`` and ``err_z``."""
+        # Refill when exhausted, or when error_rate changed since the last draw
+        if self._block_pos == len(self._error_block) or self._block_rate != self.error_rate:
+            self._draw_error_block()
+        self.err_x, self.err_z = self._error_block[self._block_pos]
+        self._block_pos += 1
+    
+    def _draw_error_block(self):
+        """Draw the X and Z error masks of the next ERROR_BLOCK_SIZE cycles at once."""
+        bits = self.rng.random((self.ERROR_BLOCK_SIZE * 2, self.num_qubits)) < self.error_rate
+        masks = _pack_masks(bits)
+        self._error_block = list(zip(masks[0::2], masks[1::2]))
+        self._block_pos = 0
+        self._block_rate = self.error_rate
+    
+    def _clear_error_block(self):
+        """Discard pre-drawn errors, so the next cycle draws from the current ``rng``."""
+        self._error_block = []
+        self._block_pos = 0
+        self._block_rate = self.error_rate
+    
+    def sample_batch(self, num_samples: int) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Measure stabilizer syndrome.
+        Sample many independent error patterns and their syndromes at once.
         
+        Vectorized counterpart of ``introduce_errors`` followed by
+        ``measure_syndrome``; the tracked ``errors`` are left untouched.
+        
+        Args:
+            num_samples: Number of error patterns to draw
+            
         Returns:
-            Tuple of (syndrome_x, syndrome_z) measurement results
+            Tuple of (errors, syndromes): errors is a (num_samples, 2, num_qubits)
+            0/1 array holding the X errors in ``[:, 0]`` and the Z errors in
+            ``[:, 1]``; syndromes is a (num_samples, num_x_stabilizers +
+            num_z_stabilizers) 0/1 array with the X syndrome bits first
         """
+        errors = (self.rng.random((num_samples, 2, self.num_qubits)) < self.error_rate).astype(np.uint8)
+        
         if self.code_type == "steane":
-            return self._measure_steane_syndrome()
+            # Parity of the errors under each stabilizer, as one matrix product
+            parity = np.zeros((3, self.num_qubits), dtype=np.uint8)
+            for i, stabilizer in enumerate(STEANE_STABILIZERS):
+                parity[i, stabilizer] = 1
+            syndrome_x = (errors[:, 0] @ parity.T) % 2
+            syndrome_z = (errors[:, 1] @ parity.T) % 2
         elif self.code_type == "surface":
-            return self._measure_surface_syndrome()
+            # Same simplified rule as measure_syndrome: an error on
+            # qubit q < num_stabilizers flags stabilizer q
+            syndrome_x = errors[:, 0, :self.num_x_stabilizers]
+            syndrome_z = errors[:, 1, :self.num_z_stabilizers]
         else:
             raise ValueError(f"Unknown code type: {self.code_type}")
-    
-    def _measure_steane_syndrome(self) -> Tuple[List[int], List[int]]:
-        """Measure Steane code syndrome."""
-        # X stabilizers
-        x_stabilizers = [
-            [0, 1, 2, 3],
-            [0, 1, 4, 5],
-            [0, 2, 4, 6],
-        ]
-        
-        syndrome_x = []
-        for stabilizer in x_stabilizers:
-            # Check if odd number of X errors in stabilizer
-            x_count = sum(1 for q in stabilizer if q in self.errors['x'])
-            syndrome_x.append(x_count % 2)
-        
-        # Z stabilizers
-        z_stabilizers = [
-            [0, 1, 2, 3],
-            [0, 1, 4, 5],
-            [0, 2, 4, 6],
-        ]
-        
-        syndrome_z = []
-        for stabilizer in z_stabilizers:
-            # Check if odd number of Z errors in stabilizer
-            z_count = sum(1 for q in stabilizer if q in self.errors['z'])
-            syndrome_z.append(z_count % 2)
         
-        return syndrome_x, syndrome_z
+        syndromes = np.concatenate([syndrome_x, syndrome_z], axis=1).astype(np.uint8)
+        return errors, syndromes
     
-    def _measure_surface_syndrome(self) -> Tuple[List[int], List[int]]:
-        """Measure surface code syndrome."""
-        # Simplified: measure based on error positions
-        # In practice, this would involve actual stabilizer measurements
+    def sample_batch_masks(self, num_samples: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Bitmask form of ``sample_batch``, for codes of at most 64 qubits.
         
-        syndrome_x = [0] * self.num_x_stabilizers
-        syndrome_z = [0] * self.num_z_stabilizers
+        Each error pattern is one uint64 per error type, and each syndrome bit
+        the parity of the errors under one stabilizer mask, for all samples at once.
         
-        # Find violated stabilizers based on error positions
-        # (Simplified implementation)
-        for q in self.errors['x']:
-            # Mark nearby X stabilizers as violated
-            if q < self.num_x_stabilizers:
-                syndrome_x[q % self.num_x_stabilizers] = 1
+        Args:
+            num_samples: Number of error patterns to draw
+            
+        Returns:
+            Tuple of (errors_x, errors_z, syndromes_x, syndromes_z), each a
+            (num_samples,) uint64 array: error bit q is qubit q, syndrome bit i
+            is stabilizer i
+        """
+        if self.num_qubits > 64 or max(self.num_x_stabilizers, self.num_z_stabilizers) > 64:
+            raise ValueError(f"Bitmask sampling needs at most 64 qubits and stabilizers, "
+                             f"code has {self.num_qubits} qubits")
+        bits = self.rng.random((num_samples, 2, self.num_qubits)) < self.error_rate
+        weights = np.uint64(1) << np.arange(self.num_qubits, dtype=np.uint64)
+        errors = bits.astype(np.uint64) @ weights
+        errors_x, errors_z = errors[:, 0], errors[:, 1]
         
-        for q in self.errors['z']:
-            if q < self.num_z_stabilizers:
-                syndrome_z[q % self.num_z_stabilizers] = 1
+        syndromes_x = np.zeros(num_samples, dtype=np.uint64)
+        for i, mask in enumerate(self.x_stab_masks):
+            syndromes_x |= _parity(errors_x & np.uint64(mask)) << np.uint64(i)
+        syndromes_z = np.zeros(num_samples, dtype=np.uint64)
+        for i, mask in enumerate(self.z_stab_masks):
+            syndromes_z |= _parity(errors_z & np.uint64(mask)) << np.uint64(i)
+        return errors_x, errors_z, syndromes_x, syndromes_z
+    
+    def measure_syndrome(self) -> Tuple[List[int], List[int]]:
+        """
+        Measure stabilizer syndrome.
+        
+        Each syndrome bit is the parity of the errors under one stabilizer
+        mask: an AND and a popcount per stabilizer.
         
+        Returns:
+            Tuple of (syndrome_x, syndrome_z) measurement results
+        """
+        if self.code_type == "steane":
+            packed = steane_syndrome(self.err_x, self.err_z)
+            return ([packed & 1, (packed >> 1) & 1, (packed >> 2) & 1],
+                    [(packed >> 3) & 1, (packed >> 4) & 1, (packed >> 5) & 1])
+        
+        syndrome_x = [bin(self.err_x & mask).count('1') & 1 for mask in self.x_stab_masks]
+        syndrome_z = [bin(self.err_z & mask).count('1') & 1 for mask in self.z_stab_masks]
         return syndrome_x, syndrome_z
     
-    def apply_correction(self, correction: Dict[str, List[int]]) -> bool:
+    def measure_syndrome_packed(self) -> Tuple[int, int]:
+        """
+        Measure stabilizer syndrome as integers (bit i = stabilizer i).
+        
+        Returns:
+            Tuple of (syndrome_x, syndrome_z) packed measurement results
+        """
+        if self.code_type == "steane":
+            packed = steane_syndrome(self.err_x, self.err_z)
+            return packed & 0b111, packed >> 3
+        
+        # Surface rule: stabilizer q flags qubit q, so the syndrome is the low error bits
+        return (self.err_x & ((1 << self.num_x_stabilizers) - 1),
+                self.err_z & ((1 << self.num_z_stabilizers) - 1))
+    
+    def apply_correction(self, correction: Union[Dict[str, List[int]], Correction]) -> bool:
         """
         Apply error correction and check if successful.
         
         Args:
-            correction: Dictionary with 'x' and 'z' keys listing corrections
+            correction: Dictionary with 'x' and 'z' keys listing corrections,
+                or a single-qubit Correction (-1 for none)
             
         Returns:
             True if correction was successful (all errors corrected)
         """
-        # Apply corrections
-        corrected_x = set(self.errors['x']) ^ set(correction.get('x', []))
-        corrected_z = set(self.errors['z']) ^ set(correction.get('z', []))
-        
-        # Check if all errors are corrected
-        success = len(corrected_x) == 0 and len(corrected_z) == 0
-        
-        # Update errors
-        self.errors = {
-            'x': list(corrected_x),
-            'z': list(corrected_z)
-        }
+        return self.apply_correction_masks(*self.correction_masks(correction))
+    
+    @staticmethod
+    def correction_masks(correction: Union[Dict[str, List[int]], Correction]) -> Tuple[int, int]:
+        """X and Z bitmasks of a correction given as a dict or a Correction."""
+        if isinstance(correction, Correction):
+            # Shifting by q + 1 and back maps the -1 sentinel to an empty mask
+            return (1 << (correction.x + 1)) >> 1, (1 << (correction.z + 1)) >> 1
+        return _qubits_to_mask(correction.get('x', [])), _qubits_to_mask(correction.get('z', []))
+    
+    def apply_correction_masks(self, mask_x: int, mask_z: int) -> bool:
+        """
+        Apply a correction given as X and Z bitmasks and check if successful.
         
-        return success
+        Args:
+            mask_x: Qubits to X-correct (bit q = qubit q)
+            mask_z: Qubits to Z-correct
+            
+        Returns:
+            True if correction was successful (all errors corrected)
+        """
+        # Flipping a corrected qubit cancels its error
+        self.err_x ^= mask_x
+        self.err_z ^= mask_z
+        return not (self.err_x | self.err_z)
     
     def reset(self):
         """Reset the simulator."""
-        self.errors = {'x': [], 'z': []}
+        self.err_x = 0
+        self.err_z = 0
+        self._clear_error_block()
 
@@ -29,6 +29,8 @@ setup(
     install_requires=requirements,
     extras_require={
         "dev": ["pytest>=7.4.0", "pytest-cov>=4.1.0", "black>=23.7.0"],
+        "numba": ["numba>=0.58.0"],
+        "gpu": ["cupy>=12.0.0"],
     },
 )
 
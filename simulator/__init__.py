@@ -6,7 +6,9 @@ to simulate FPGA-like acceleration for quantum computations.
 """
 
 from .circuit import QuantumCircuit
-from .fpga_simulator import FPGASimulator
+from .fpga_simulator import ComputePrecision, FPGASimulator
+from .mps import MPSState
+from .parametric import ParametricCircuit
 from .quantum_gates import (
     I,
     X,
@@ -30,6 +32,9 @@ __version__ = "0.1.0"
 __all__ = [
     "QuantumCircuit",
     "FPGASimulator",
+    "ComputePrecision",
+    "MPSState",
+    "ParametricCircuit",
     "I",
     "X",
     "Y",
@@ -5,12 +5,401 @@ This module implements a high-performance quantum circuit simulator using JAX
 for JIT compilation and parallel processing, simulating FPGA-like acceleration.
 """
 
+import functools
+import math
+import os
+from enum import Enum
 import numpy as np
-from typing import Optional, Union
+from typing import List, Optional, Sequence, Tuple, Union
 import jax
 import jax.numpy as jnp
-from jax import jit, vmap
-from .quantum_gates import I
+import opt_einsum as oe
+from scipy import sparse
+from jax import jit
+from . import numba_backend, quantum_gates
+from .mps import MPSState
+from .quantum_gates import as_dtype
+
+# Optional CuPy backend for GPU offload; einsum routes through cuTENSOR unless
+# the user has already chosen CuPy accelerators
+try:
+    os.environ.setdefault("CUPY_ACCELERATORS", "cutensor")
+    import cupy as cp
+    CUPY_AVAILABLE = True
+except ImportError:
+    cp = None
+    CUPY_AVAILABLE = False
+
+
+def _gate_subscripts(ndim: int, qubit_indices: Tuple[int, ...]) -> str:
+    """
+    Build the einsum equation contracting a gate tensor into a state tensor.
+    
+    The gate is reshaped to ``(2,) * 2k`` with output axes first and input axes
+    last, both ordered as ``qubit_indices``. Qubit q sits on state axis
+    ``ndim - 1 - q``; any leading (batch) axes pass through untouched.
+    """
+    state = [oe.get_symbol(i) for i in range(ndim)]
+    outputs = [oe.get_symbol(ndim + i) for i in range(len(qubit_indices))]
+    inputs = [state[ndim - 1 - q] for q in qubit_indices]
+    result = list(state)
+    for q, symbol in zip(qubit_indices, outputs):
+        result[ndim - 1 - q] = symbol
+    return f"{''.join(outputs + inputs)},{''.join(state)}->{''.join(result)}"
+
+
+@functools.lru_cache(maxsize=None)
+def _gate_expression(state_shape: Tuple[int, ...], qubit_indices: Tuple[int, ...]):
+    """Compiled opt_einsum contraction for one (state shape, wiring) pair."""
+    gate_shape = (2,) * (2 * len(qubit_indices))
+    return oe.contract_expression(_gate_subscripts(len(state_shape), qubit_indices),
+                                  gate_shape, state_shape)
+
+
+@functools.partial(jit, static_argnames=('qubit_indices',))
+def _contract_gate_jax(state: jnp.ndarray, gate: jnp.ndarray, qubit_indices: Tuple[int, ...]) -> jnp.ndarray:
+    """
+    JIT-compiled gate contraction, specialized per wiring and state shape.
+    
+    The gate may be a host (NumPy) array of any precision: it is cast to the
+    state dtype inside the compiled kernel, so no eager conversion is needed.
+    """
+    gate_tensor = gate.astype(state.dtype).reshape((2,) * (2 * len(qubit_indices)))
+    return jnp.einsum(_gate_subscripts(state.ndim, qubit_indices), gate_tensor, state)
+
+
+# Per-arity JAX kernels: the state is viewed with the target qubits as the
+# only length-2 axes, between merged blocks of untouched axes, and the gate is
+# written out as a few multiply-adds of slices that XLA fuses into one pass,
+# instead of a general contraction over every qubit axis.
+
+@functools.partial(jit, static_argnames=('qubit_indices',))
+def _apply_1q_jax(state: jnp.ndarray, gate: jnp.ndarray, qubit_indices: Tuple[int, ...]) -> jnp.ndarray:
+    """One-qubit form of ``_contract_gate_jax``, on a ``(lead, 2, trail)`` view."""
+    gate = gate.astype(state.dtype)
+    axis = state.ndim - 1 - qubit_indices[0]
+    view = state.reshape(math.prod(state.shape[:axis]), 2, math.prod(state.shape[axis + 1:]))
+    amp_0, amp_1 = view[:, 0], view[:, 1]
+    out = jnp.stack([gate[0, 0] * amp_0 + gate[0, 1] * amp_1,
+                     gate[1, 0] * amp_0 + gate[1, 1] * amp_1], axis=1)
+    return out.reshape(state.shape)
+
+
+@functools.partial(jit, static_argnames=('qubit_indices',))
+def _apply_2q_jax(state: jnp.ndarray, gate: jnp.ndarray, qubit_indices: Tuple[int, ...]) -> jnp.ndarray:
+    """Two-qubit form of ``_contract_gate_jax``, on a ``(lead, 2, mid, 2, trail)`` view."""
+    gate = gate.astype(state.dtype).reshape(2, 2, 2, 2)
+    if qubit_indices[0] < qubit_indices[1]:
+        # Order the gate's qubits as the view's axes: higher qubit first
+        gate = gate.transpose(1, 0, 3, 2)
+    axis_hi = state.ndim - 1 - max(qubit_indices)
+    axis_lo = state.ndim - 1 - min(qubit_indices)
+    shape = state.shape
+    view = state.reshape(math.prod(shape[:axis_hi]), 2, math.prod(shape[axis_hi + 1:axis_lo]),
+                         2, math.prod(shape[axis_lo + 1:]))
+    amps = [[view[:, k, :, l] for l in range(2)] for k in range(2)]
+    rows = [jnp.stack([sum(gate[i, j, k, l] * amps[k][l] for k in range(2) for l in range(2))
+                       for j in range(2)], axis=2)
+            for i in range(2)]
+    return jnp.stack(rows, axis=1).reshape(shape)
+
+
+# JAX gate kernel by gate arity; wider gates use the general contraction
+_ARITY_KERNELS_JAX = {1: _apply_1q_jax, 2: _apply_2q_jax}
+
+
+def _gate_kernel_jax(num_gate_qubits: int):
+    """The jitted JAX kernel for gates on ``num_gate_qubits`` qubits."""
+    return _ARITY_KERNELS_JAX.get(num_gate_qubits, _contract_gate_jax)
+
+
+@functools.partial(jit, donate_argnums=0)
+def _reset_state_jax(state: jnp.ndarray) -> jnp.ndarray:
+    """Overwrite a statevector with |00...0⟩, reusing its (donated) buffer."""
+    return jnp.zeros_like(state).at[..., 0].set(1.0 + 0j)
+
+
+class ComputePrecision(str, Enum):
+    """Amplitude precision of a simulator (the plain strings are accepted too)."""
+    DOUBLE = 'double'
+    SINGLE = 'single'
+
+
+# Amplitude dtype per precision: 'single' stores float32 real/imag components,
+# halving the bytes moved per gate on memory-bound (large n) circuits.
+_PRECISION_DTYPES = {
+    'double': np.complex128,
+    'single': np.complex64,
+}
+
+
+@jit
+def _probabilities_jax(state: jnp.ndarray) -> jnp.ndarray:
+    """|amplitude|^2 as a fused re^2 + im^2 pass (no complex abs temporary)."""
+    return jnp.square(state.real) + jnp.square(state.imag)
+
+
+@functools.lru_cache(maxsize=None)
+def cnot_chain_perm(num_qubits: int, qubits: Tuple[int, ...]) -> np.ndarray:
+    """
+    Gather map of the CNOT chain CNOT(q0, q1), CNOT(q1, q2), ... on basis states.
+    
+    The chain permutes basis states, so it is found by classically pushing every
+    basis index through each CNOT (target bit ^= control bit) at once.
+    
+    Args:
+        num_qubits: Number of qubits in the register
+        qubits: Chain of qubit indices
+        
+    Returns:
+        Index array ``perm`` such that the chain maps a statevector ``s`` to ``s[perm]``
+    """
+    image = np.arange(1 << num_qubits)
+    for control, target in zip(qubits[:-1], qubits[1:]):
+        image ^= ((image >> control) & 1) << target
+    # Amplitude i moves to image[i], so the gather map is the inverse permutation
+    perm = np.empty_like(image)
+    perm[image] = np.arange(1 << num_qubits)
+    return perm
+
+
+# Pure gate kernels on the state tensor (qubit q on axis -1 - q, leading batch
+# axes untouched). Each takes (xp, psi, num_qubits, qubits, matrix) and returns
+# the new tensor, so they serve both FPGASimulator's methods and whole-circuit
+# folds traced under jax.jit.
+
+def _axis_vector(xp, psi, values, qubit: int):
+    """Shape a length-2 vector so it broadcasts along the axis of ``qubit``."""
+    shape = [1] * psi.ndim
+    shape[-1 - qubit] = 2
+    return xp.asarray(values, dtype=psi.dtype).reshape(shape)
+
+
+def _qubit_probabilities(xp, psi, qubit: int):
+    """Total probability of ``qubit`` being |0⟩ and |1⟩, as a length-2 array."""
+    probs = xp.square(psi.real) + xp.square(psi.imag)
+    axis = psi.ndim - 1 - qubit
+    return probs.sum(axis=tuple(a for a in range(psi.ndim) if a != axis))
+
+
+def _collapse(xp, psi, qubit: int, result: int, norm: float):
+    """Project ``qubit`` onto ``|result⟩`` and divide by ``norm``."""
+    keep = [0.0, 1.0 / norm] if result else [1.0 / norm, 0.0]
+    return psi * _axis_vector(xp, psi, keep, qubit)
+
+
+# JAX versions work on the flat state with a traced qubit, selecting each half
+# by index bit, so one compilation serves every qubit and outcome
+
+@jit
+def _qubit_probabilities_jax(state: jnp.ndarray, qubit: int) -> jnp.ndarray:
+    """Flat-state form of ``_qubit_probabilities``."""
+    bit = (jnp.arange(state.shape[-1]) >> qubit) & 1
+    probs = jnp.square(state.real) + jnp.square(state.imag)
+    prob_1 = jnp.sum(jnp.where(bit == 1, probs, 0.0))
+    return jnp.stack([jnp.sum(probs) - prob_1, prob_1])
+
+
+@jit
+def _collapse_jax(state: jnp.ndarray, qubit: int, result: int, norm: float) -> jnp.ndarray:
+    """Flat-state form of ``_collapse``."""
+    bit = (jnp.arange(state.shape[-1]) >> qubit) & 1
+    return jnp.where(bit == result, state / norm, 0.0).astype(state.dtype)
+
+
+@jit
+def _pauli_expectation_jax(state: jnp.ndarray, x_mask: int, z_mask: int, phase: complex) -> jnp.ndarray:
+    """Flat-state form of ``_pauli_expectation``, with the masks traced."""
+    index = jnp.arange(state.shape[-1])
+    sign = 1 - 2 * (jax.lax.population_count(index & z_mask) & 1)
+    return jnp.real(phase * jnp.vdot(state[index ^ x_mask], sign * state))
+
+
+def _pauli_expectation(xp, psi, x_qubits: Tuple[int, ...], z_qubits: Tuple[int, ...], phase: complex):
+    """
+    ⟨ψ|P|ψ⟩ for the Pauli string P = phase · X(x_qubits) Z(z_qubits).
+    
+    X flips the qubit axes and Z negates their |1⟩ halves, so P is applied
+    as views and broadcast signs without ever building its matrix.
+    """
+    p_psi = psi
+    for qubit in z_qubits:
+        p_psi = p_psi * _axis_vector(xp, psi, [1.0, -1.0], qubit)
+    if x_qubits:
+        p_psi = xp.flip(p_psi, axis=tuple(-1 - q for q in x_qubits))
+    return float(xp.real(phase * xp.vdot(psi, p_psi)))
+
+
+def _x_kernel(xp, psi, num_qubits, qubits, matrix):
+    return xp.flip(psi, axis=-1 - qubits[0])
+
+
+def _y_kernel(xp, psi, num_qubits, qubits, matrix):
+    return xp.flip(psi, axis=-1 - qubits[0]) * _axis_vector(xp, psi, [-1j, 1j], qubits[0])
+
+
+def _phase_kernel(phase: complex):
+    """Kernel multiplying the |1⟩ half of the qubit axis by ``phase``."""
+    def kernel(xp, psi, num_qubits, qubits, matrix):
+        return psi * _axis_vector(xp, psi, [1.0, phase], qubits[0])
+    return kernel
+
+
+def _h_kernel(xp, psi, num_qubits, qubits, matrix):
+    flipped = xp.flip(psi, axis=-1 - qubits[0])
+    return (flipped + psi * _axis_vector(xp, psi, [1.0, -1.0], qubits[0])) / math.sqrt(2)
+
+
+def _diagonal_kernel(xp, psi, num_qubits, qubits, matrix):
+    """Diagonal k-qubit gate (``matrix`` holds its diagonal) as one broadcast multiply."""
+    k = len(qubits)
+    phases = xp.asarray(matrix, dtype=psi.dtype).reshape((2,) * k)
+    # Order the gate axes like their state axes (qubit q on axis -1 - q), then
+    # give every other state axis length 1
+    order = sorted(range(k), key=lambda i: -qubits[i])
+    shape = [1] * psi.ndim
+    for q in qubits:
+        shape[-1 - q] = 2
+    return psi * xp.transpose(phases, order).reshape(shape)
+
+
+def _cnot_kernel(xp, psi, num_qubits, qubits, matrix):
+    control, target = qubits
+    control_set = _axis_vector(xp, psi, [0.0, 1.0], control) != 0
+    return xp.where(control_set, xp.flip(psi, axis=-1 - target), psi)
+
+
+def _swap_kernel(xp, psi, num_qubits, qubits, matrix):
+    return xp.swapaxes(psi, -1 - qubits[0], -1 - qubits[1])
+
+
+def _cnot_chain_kernel(xp, psi, num_qubits, qubits, matrix):
+    flat = psi.reshape(psi.shape[:-num_qubits] + (-1,))
+    flat = xp.take(flat, xp.asarray(cnot_chain_perm(num_qubits, tuple(qubits))), axis=-1)
+    return flat.reshape(psi.shape)
+
+
+def _gate_kernel(xp, psi, num_qubits, qubits, matrix):
+    """General k-qubit gate, contracted directly into the affected qubit axes."""
+    qubits = tuple(qubits)
+    if xp is jnp:
+        return _gate_kernel_jax(len(qubits))(psi, matrix, qubit_indices=qubits)
+    gate_tensor = matrix.reshape((2,) * (2 * len(qubits)))
+    # opt_einsum dispatches to cupy.einsum when the state lives on the GPU
+    return _gate_expression(psi.shape, qubits)(gate_tensor, psi)
+
+
+_TENSOR_KERNELS = {
+    'apply_x': _x_kernel,
+    'apply_y': _y_kernel,
+    'apply_z': _phase_kernel(-1.0),
+    'apply_s': _phase_kernel(1j),
+    'apply_t': _phase_kernel(np.exp(1j * np.pi / 4)),
+    'apply_h': _h_kernel,
+    'apply_cnot': _cnot_kernel,
+    'apply_swap': _swap_kernel,
+    'apply_cnot_chain': _cnot_chain_kernel,
+    'apply_diagonal_gate': _diagonal_kernel,
+    'apply_gate': _gate_kernel,
+}
+
+
+# Bound on FPGASimulator's per-instance device gate cache (matches the angle LRU)
+_GATE_CACHE_SIZE = 4096
+
+# Gate matrices standing in for the tensor kernels on the MPS backend
+_MPS_GATES = {
+    'apply_x': quantum_gates.X,
+    'apply_y': quantum_gates.Y,
+    'apply_z': quantum_gates.Z,
+    'apply_s': quantum_gates.S,
+    'apply_t': quantum_gates.T,
+    'apply_h': quantum_gates.H,
+    'apply_cnot': quantum_gates.CNOT,
+    'apply_swap': quantum_gates.SWAP,
+}
+
+
+def apply_tensor_op(xp, psi, num_qubits: int, method: str, qubits: Tuple[int, ...], matrix=None):
+    """
+    Apply one circuit operation to a state tensor without side effects.
+    
+    Args:
+        xp: Array module of ``psi`` (numpy, jax.numpy or cupy)
+        psi: State tensor of shape ``batch + (2,) * num_qubits``
+        num_qubits: Number of qubits in the register
+        method: FPGASimulator method name of the operation (e.g. 'apply_h')
+        qubits: Qubits the operation acts on
+        matrix: Gate matrix, only used by 'apply_gate' (its diagonal for
+            'apply_diagonal_gate')
+        
+    Returns:
+        New state tensor
+    """
+    return _TENSOR_KERNELS[method](xp, psi, num_qubits, qubits, matrix)
+
+
+def _embed_gate(matrix: np.ndarray, qubits: Tuple[int, ...], block: Tuple[int, ...]) -> np.ndarray:
+    """
+    Extend a gate on ``qubits`` to the larger ordered qubit set ``block``.
+    
+    Both follow the gate convention: the first listed qubit is the matrix MSB.
+    """
+    if qubits == block:
+        return matrix
+    extra = tuple(q for q in block if q not in qubits)
+    full = np.kron(matrix, np.eye(1 << len(extra), dtype=matrix.dtype))
+    # Axes of ``full`` follow qubits + extra; permute them into block order
+    order = qubits + extra
+    perm = [order.index(q) for q in block]
+    k = len(block)
+    tensor = full.reshape((2,) * (2 * k)).transpose(perm + [k + p for p in perm])
+    return tensor.reshape(1 << k, 1 << k)
+
+
+def fuse_gates(ops: Sequence[Tuple[np.ndarray, Sequence[int]]],
+               max_qubits: int = 2) -> List[Tuple[np.ndarray, Tuple[int, ...]]]:
+    """
+    Merge runs of consecutive gates into single gates on at most ``max_qubits`` qubits.
+    
+    A gate joins the current block while the union of their qubits stays within
+    ``max_qubits``; the block's matrix is the product of its gates. Fewer, wider
+    gates mean fewer passes over the statevector.
+    
+    Args:
+        ops: Gates as ``(matrix, qubit_indices)`` pairs, in circuit order
+        max_qubits: Largest qubit count of a fused gate
+        
+    Returns:
+        Fused ``(matrix, qubit_indices)`` pairs, in circuit order
+    """
+    fused = []
+    block_matrix, block_qubits = None, ()
+    for matrix, qubits in ops:
+        matrix = np.asarray(matrix, dtype=np.complex128)
+        qubits = tuple(int(q) for q in qubits)
+        union = block_qubits + tuple(q for q in qubits if q not in block_qubits)
+        if block_matrix is not None and len(union) <= max_qubits:
+            block_matrix = _embed_gate(matrix, qubits, union) @ _embed_gate(block_matrix, block_qubits, union)
+            block_qubits = union
+            continue
+        if block_matrix is not None:
+            fused.append((block_matrix, block_qubits))
+        block_matrix, block_qubits = matrix, qubits
+    if block_matrix is not None:
+        fused.append((block_matrix, block_qubits))
+    return fused
+
+
+@functools.lru_cache(maxsize=256)
+def _circuit_executor(wiring: Tuple[Tuple[int, ...], ...]):
+    """Jitted ``run(psi, matrices) -> psi`` applying gates of a fixed wiring in one dispatch."""
+    def run(psi, matrices):
+        for qubits, matrix in zip(wiring, matrices):
+            psi = _gate_kernel_jax(len(qubits))(psi, matrix, qubit_indices=qubits)
+        return psi
+    
+    return jax.jit(run)
 
 
 class FPGASimulator:
@@ -22,47 +411,147 @@ class FPGASimulator:
     fast statevector updates and matrix-vector multiplications.
     """
     
-    def __init__(self, num_qubits: int, use_jax: bool = True):
+    def __init__(self, num_qubits: int, use_jax: bool = True,
+                 precision: Union[str, ComputePrecision] = 'double',
+                 use_gpu: bool = False, backend: str = 'statevector',
+                 max_bond_dim: Optional[int] = None, device: Optional[str] = None):
         """
         Initialize the FPGA simulator.
         
         Args:
             num_qubits: Number of qubits in the system
             use_jax: Whether to use JAX for acceleration (default: True)
+            precision: Amplitude precision, a ComputePrecision or its value: 'double'
+                (complex128) or 'single' (complex64, half the memory traffic);
+                'double' on the JAX path enables ``jax_enable_x64`` process-wide
+            use_gpu: Keep the statevector on the GPU and apply gates with CuPy
+                (requires CuPy; takes precedence over ``use_jax``)
+            backend: 'statevector' (dense 2^n amplitudes, up to 30 qubits),
+                'numba' (the same NumPy statevector, with one- and two-qubit gates
+                applied in place by parallel Numba loops; requires Numba) or
+                'tensornet' (a matrix product state whose memory grows linearly in
+                n for weakly entangled circuits; runs on NumPy)
+            max_bond_dim: Largest MPS bond dimension kept by the 'tensornet'
+                backend (None keeps every non-negligible singular value)
+            device: Where the JAX state lives, 'cpu' or 'gpu' (None: JAX's default
+                device). With ``use_jax=False``, 'gpu' selects CuPy like ``use_gpu``
         """
-        if num_qubits < 1 or num_qubits > 16:
-            raise ValueError(f"Number of qubits must be between 1 and 16, got {num_qubits}")
+        if backend not in ('statevector', 'numba', 'tensornet'):
+            raise ValueError(f"Backend must be 'statevector', 'numba' or 'tensornet', got {backend!r}")
+        if num_qubits < 1 or (backend != 'tensornet' and num_qubits > 30):
+            raise ValueError(f"Number of qubits must be between 1 and 30, got {num_qubits}")
+        if precision not in _PRECISION_DTYPES:
+            raise ValueError(f"Precision must be one of {list(_PRECISION_DTYPES)}, got {precision!r}")
+        if device not in (None, 'cpu', 'gpu'):
+            raise ValueError(f"Device must be 'cpu' or 'gpu', got {device!r}")
+        if device == 'gpu' and not use_jax:
+            use_gpu = True
+        if use_gpu and not CUPY_AVAILABLE:
+            raise ImportError("use_gpu=True requires CuPy (pip install cupy)")
+        if backend == 'numba' and not numba_backend.NUMBA_AVAILABLE:
+            raise ImportError("backend='numba' requires Numba (pip install numba)")
+        if use_gpu and backend != 'statevector':
+            raise ValueError(f"The {backend!r} backend runs on the CPU only")
         
         self.num_qubits = num_qubits
         self.dimension = 2 ** num_qubits
-        self.use_jax = use_jax
+        self.backend = backend
+        self.use_gpu = use_gpu
+        self.use_jax = use_jax and not use_gpu and backend == 'statevector'
+        use_jax = self.use_jax
+        # Array module for the non-JAX paths: CuPy mirrors the NumPy API on the GPU
+        self._xp = jnp if use_jax else (cp if use_gpu else np)
+        self.precision = ComputePrecision(precision)
+        self.dtype = _PRECISION_DTYPES[precision]
+        if use_jax and self.dtype == np.complex128:
+            # JAX silently truncates complex128 to complex64 unless x64 is on
+            jax.config.update("jax_enable_x64", True)
+        # JAX device the state is committed to (None: left to JAX's default)
+        self._device = None
+        if use_jax and device is not None:
+            try:
+                self._device = jax.devices(device)[0]
+            except RuntimeError as error:
+                raise ValueError(f"No JAX {device!r} device available") from error
+        
+        # Backend copies of read-only gate matrices, keyed by id(gate); each
+        # entry keeps its source alive so the id cannot be reused
+        self._gate_cache = {}
+        # Ahead-of-time compiled gate kernels from precompile(), keyed by
+        # (state tensor shape, qubit_indices)
+        self._compiled = {}
         
-        # Initialize statevector in |00...0⟩ state
+        if backend == 'tensornet':
+            self._mps = MPSState(num_qubits, self.dtype, max_bond_dim=max_bond_dim)
+            return
+        self._mps = None
+        
+        # Initialize statevector in |00...0⟩ state. It is stored in whichever
+        # form was last produced: flat, or as the rank-n tensor gates act on
+        self._state_is_tensor = False
         if use_jax:
-            self.statevector = jnp.zeros(self.dimension, dtype=jnp.complex128)
-            self.statevector = self.statevector.at[0].set(1.0 + 0j)
+            self.statevector = self._place(jnp.zeros(self.dimension, dtype=self.dtype).at[0].set(1.0 + 0j))
         else:
-            self.statevector = np.zeros(self.dimension, dtype=np.complex128)
+            self.statevector = self._xp.zeros(self.dimension, dtype=self.dtype)
             self.statevector[0] = 1.0 + 0j
     
-    def reset(self):
-        """Reset the statevector to |00...0⟩."""
-        if self.use_jax:
-            self.statevector = jnp.zeros(self.dimension, dtype=jnp.complex128)
-            self.statevector = self.statevector.at[0].set(1.0 + 0j)
-        else:
-            self.statevector = np.zeros(self.dimension, dtype=np.complex128)
-            self.statevector[0] = 1.0 + 0j
+    def _place(self, array):
+        """Commit a JAX (or host) array to the simulator's device, if one was requested."""
+        if self._device is None:
+            return array
+        return jax.device_put(array, self._device)
+    
+    @property
+    def statevector(self):
+        """The amplitudes as a flat array, shape ``batch + (2**num_qubits,)``."""
+        if self._mps is not None:
+            # Dense view of the MPS, contracted on demand
+            return self._mps.to_statevector()
+        if self._state_is_tensor:
+            self._state = self._state.reshape(self._state.shape[:-self.num_qubits] + (self.dimension,))
+            self._state_is_tensor = False
+        return self._state
+    
+    @statevector.setter
+    def statevector(self, state):
+        if self._mps is not None:
+            self._mps.set_statevector(state)
+            return
+        self._state = state
+        self._state_is_tensor = False
     
-    @jit
-    def _apply_gate_jax(state: jnp.ndarray, gate_matrix: jnp.ndarray, indices: jnp.ndarray) -> jnp.ndarray:
+    def reset(self, batch_size: Optional[int] = None):
         """
-        JIT-compiled gate application using JAX.
+        Reset the statevector to |00...0⟩.
         
-        This function simulates FPGA-like parallel processing by using JAX's
-        optimized matrix-vector multiplication.
+        Args:
+            batch_size: If given, allocate ``batch_size`` independent copies of the
+                register along a leading batch axis, so that every subsequent gate
+                is applied to the whole batch in a single dispatch.
         """
-        return jnp.dot(gate_matrix, state[indices])
+        if self._mps is not None:
+            if batch_size is not None:
+                raise ValueError("The 'tensornet' backend does not support batched execution")
+            self._mps.reset()
+            return
+        shape = (self.dimension,) if batch_size is None else (batch_size, self.dimension)
+        
+        # Reuse the existing buffer when the shape is unchanged, avoiding a fresh
+        # allocation per run and keeping the state hot in cache
+        if self.statevector.shape == shape:
+            if self.use_jax:
+                self.statevector = _reset_state_jax(self.statevector)
+                return
+            if getattr(self.statevector.flags, 'writeable', True):
+                self.statevector.fill(0)
+                self.statevector[..., 0] = 1.0 + 0j
+                return
+        
+        if self.use_jax:
+            self.statevector = self._place(jnp.zeros(shape, dtype=self.dtype).at[..., 0].set(1.0 + 0j))
+        else:
+            self.statevector = self._xp.zeros(shape, dtype=self.dtype)
+            self.statevector[..., 0] = 1.0 + 0j
     
     def apply_gate(self, gate_matrix: Union[np.ndarray, jnp.ndarray], qubit_indices: list):
         """
@@ -83,75 +572,275 @@ class FPGASimulator:
             raise ValueError(f"Gate size {gate_size} requires {num_affected_qubits} qubits, "
                            f"but {len(qubit_indices)} indices provided")
         
-        # Convert to JAX if needed
-        if self.use_jax and isinstance(gate_matrix, np.ndarray):
-            gate_matrix = jnp.array(gate_matrix)
-        elif not self.use_jax and isinstance(gate_matrix, jnp.ndarray):
-            gate_matrix = np.array(gate_matrix)
+        # Two-qubit gates contract into the two MPS sites with an SVD split;
+        # wider ones go through the dense state
+        if self._mps is not None and num_affected_qubits <= 2:
+            self._mps.apply_gate(as_dtype(gate_matrix, self.dtype), [int(q) for q in qubit_indices])
+            return
+        if self.backend == 'numba' and num_affected_qubits <= 2:
+            self._apply_numba(as_dtype(np.asarray(gate_matrix), self.dtype), qubit_indices)
+            return
         
-        # Expand gate to full Hilbert space
-        full_gate = self._expand_gate_to_full_space(gate_matrix, qubit_indices)
+        gate_matrix = self._device_gate(gate_matrix)
+        qubits = tuple(int(q) for q in qubit_indices)
         
-        # Apply gate using parallel matrix-vector multiplication
-        # This simulates FPGA's parallel multipliers and adders working on all amplitudes
-        if self.use_jax:
-            self.statevector = jnp.dot(full_gate, self.statevector)
+        if self._compiled:
+            # Precompiled wiring: call the executable directly, skipping the tracer
+            psi = self._as_tensor()
+            compiled = self._compiled.get((psi.shape, qubits))
+            if compiled is not None and gate_matrix.dtype == self.dtype:
+                self._from_tensor(compiled(psi, gate_matrix))
+                return
+        
+        # Contract the gate directly into the affected qubit axes of the state
+        # tensor; this simulates FPGA's parallel multipliers and adders working on
+        # all amplitudes without ever building the 2^n x 2^n operator.
+        psi = apply_tensor_op(self._xp, self._as_tensor(), self.num_qubits, 'apply_gate',
+                              qubits, gate_matrix)
+        self._from_tensor(psi)
+    
+    def _apply_numba(self, gate: np.ndarray, qubit_indices: Sequence[int]):
+        """Apply a one- or two-qubit gate in place with the Numba stride kernels."""
+        state = self.statevector
+        if not (state.flags.c_contiguous and state.flags.writeable):
+            # Views left by the permutation fast paths, or read-only buffers
+            state = np.array(state, order='C')
+        rows = state.reshape(-1, self.dimension)
+        if len(qubit_indices) == 1:
+            numba_backend.apply_1q(rows, gate, int(qubit_indices[0]))
         else:
-            self.statevector = np.dot(full_gate, self.statevector)
+            numba_backend.apply_2q(rows, gate, int(qubit_indices[0]), int(qubit_indices[1]))
+        self.statevector = state
     
-    def _expand_gate_to_full_space(self, gate: Union[np.ndarray, jnp.ndarray], qubit_indices: list) -> Union[np.ndarray, jnp.ndarray]:
+    def precompile(self, schema: Sequence[Tuple[int, Sequence[int]]]):
         """
-        Expand a gate acting on specific qubits to the full Hilbert space.
+        Compile the JAX gate kernels of a workload ahead of time.
+        
+        Each ``(gate_size, qubit_indices)`` pair is lowered and compiled for
+        the current state shape and precision; ``apply_gate`` then calls the
+        stored executable directly, so the first gate of each wiring pays no
+        trace or compile. A no-op on the NumPy, CuPy and tensornet backends,
+        whose kernels are not compiled.
         
-        This simulates how an FPGA would construct the full gate matrix by
-        applying the gate in parallel across all basis states.
+        Args:
+            schema: ``(gate_size, qubit_indices)`` pairs expected in the workload,
+                e.g. ``[(2, [0]), (4, [0, 1])]``
         """
-        gate_size = gate.shape[0]
-        use_jax = self.use_jax
+        if not self.use_jax:
+            return
+        sharding = None if self._device is None else jax.sharding.SingleDeviceSharding(self._device)
+        state = jax.ShapeDtypeStruct(self._as_tensor().shape, self.dtype, sharding=sharding)
+        for gate_size, qubit_indices in schema:
+            qubits = tuple(int(q) for q in qubit_indices)
+            if gate_size != 1 << len(qubits):
+                raise ValueError(f"Gate size {gate_size} does not match {len(qubits)} qubit indices")
+            key = (state.shape, qubits)
+            if key not in self._compiled:
+                gate = jax.ShapeDtypeStruct((gate_size, gate_size), self.dtype, sharding=sharding)
+                kernel = _gate_kernel_jax(len(qubits))
+                self._compiled[key] = kernel.lower(state, gate, qubit_indices=qubits).compile()
+    
+    def _device_gate(self, gate):
+        """
+        ``gate`` as a backend array in the state precision.
         
-        # Create mask for affected qubits
-        affected_mask = 0
-        for q in qubit_indices:
-            affected_mask |= (1 << q)
+        Read-only matrices (the constants and angle-cached gates of
+        ``quantum_gates``) are converted once and the device copy is reused, so
+        repeated gates cost no host-to-device transfer. Other matrices are
+        converted per call; on JAX they are passed as is and the jitted kernel
+        casts them on the fly.
+        """
+        if isinstance(gate, np.ndarray) and not gate.flags.writeable:
+            cached = self._gate_cache.get(id(gate))
+            if cached is None:
+                if len(self._gate_cache) >= _GATE_CACHE_SIZE:
+                    self._gate_cache.clear()
+                converted = as_dtype(gate, self.dtype)
+                converted = self._place(converted) if self._device is not None else self._xp.asarray(converted)
+                cached = self._gate_cache[id(gate)] = (gate, converted)
+            return cached[1]
+        if self.use_jax:
+            return gate
+        return self._xp.asarray(as_dtype(gate, self.dtype))
+    
+    def run_circuit(self, ops: Sequence[Tuple[np.ndarray, Sequence[int]]], max_fused_qubits: int = 3):
+        """
+        Apply a whole gate sequence, fusing neighbouring gates first.
         
-        # Build full gate matrix using bit manipulation
-        # This simulates FPGA's parallel index computation
-        if use_jax:
-            full_gate = jnp.zeros((self.dimension, self.dimension), dtype=jnp.complex128)
+        Consecutive gates are merged (see ``fuse_gates``) while they fit on
+        ``max_fused_qubits`` qubits. On JAX, the fused sequence then runs as
+        one compiled function, cached per wiring, so XLA sees the whole
+        dataflow instead of one dispatch per gate.
+        
+        Args:
+            ops: Gates as ``(matrix, qubit_indices)`` pairs, in circuit order
+            max_fused_qubits: Largest qubit count of a fused gate (1 disables
+                fusion across different qubits)
+        """
+        if self._mps is not None:
+            # Fused gates wider than two qubits would leave the MPS
+            max_fused_qubits = min(max_fused_qubits, 2)
+        fused = fuse_gates(ops, max_fused_qubits)
+        for matrix, qubits in fused:
+            if any(q < 0 or q >= self.num_qubits for q in qubits):
+                raise ValueError(f"Qubit indices {qubits} out of range [0, {self.num_qubits})")
+        if not self.use_jax:
+            for matrix, qubits in fused:
+                self.apply_gate(matrix, qubits)
+            return
+        
+        executor = _circuit_executor(tuple(qubits for _, qubits in fused))
+        self._from_tensor(executor(self._as_tensor(), [matrix for matrix, _ in fused]))
+    
+    def run_batched(self, circuit, params_batch):
+        """
+        Run a ParametricCircuit for a whole batch of parameter sets at once.
+        
+        The circuit's jitted ``run`` is vectorized with ``jax.vmap``, so the B
+        circuits execute as one fused program instead of B dispatches. The
+        results become this simulator's state along a leading batch axis, as
+        with ``reset(batch_size=B)``.
+        
+        Args:
+            circuit: ``ParametricCircuit`` on ``num_qubits`` qubits
+            params_batch: Angles, shape ``(batch, len(circuit.parameters))``
+            
+        Returns:
+            The ``(batch, 2**num_qubits)`` final statevectors on the simulator's backend
+        """
+        if circuit.num_qubits != self.num_qubits:
+            raise ValueError(f"Circuit has {circuit.num_qubits} qubits, simulator has {self.num_qubits}")
+        if self._mps is not None:
+            raise ValueError("The 'tensornet' backend does not support batched execution")
+        states = circuit.compile_batched()(circuit._angles(params_batch)).astype(self.dtype)
+        if self.use_jax:
+            self.statevector = self._place(states)
         else:
-            full_gate = np.zeros((self.dimension, self.dimension), dtype=np.complex128)
-        
-        # For each output state, compute contribution from all input states
-        # This loop simulates FPGA's parallel processing of all state pairs
-        for out_idx in range(self.dimension):
-            for in_idx in range(self.dimension):
-                # Check if in_idx and out_idx match on unaffected qubits
-                if (in_idx & ~affected_mask) != (out_idx & ~affected_mask):
-                    continue
-                
-                # Extract affected qubit values (simulating parallel bit extraction)
-                in_affected = 0
-                out_affected = 0
-                bit_pos = 0
-                for q in sorted(qubit_indices):
-                    if (in_idx >> q) & 1:
-                        in_affected |= (1 << bit_pos)
-                    if (out_idx >> q) & 1:
-                        out_affected |= (1 << bit_pos)
-                    bit_pos += 1
-                
-                # Set the gate matrix element
-                if use_jax:
-                    full_gate = full_gate.at[out_idx, in_idx].set(gate[out_affected, in_affected])
-                else:
-                    full_gate[out_idx, in_idx] = gate[out_affected, in_affected]
-        
-        return full_gate
-    
-    def get_statevector(self) -> np.ndarray:
-        """Get the current statevector as a NumPy array."""
+            self.statevector = self._xp.asarray(np.asarray(states))
+        return self.get_statevector()
+    
+    def _as_tensor(self):
+        """
+        View the statevector as a rank-n tensor with one length-2 axis per qubit.
+        
+        Qubit q is bit q of the basis-state index, so it lives on axis ``-1 - q``;
+        counting from the end keeps an optional leading batch axis untouched.
+        The tensor is kept, so back-to-back gates reshape only once.
+        """
+        if self._mps is not None:
+            return self.statevector.reshape((2,) * self.num_qubits)
+        if not self._state_is_tensor:
+            state = self._state
+            self._state = state.reshape(state.shape[:-1] + (2,) * self.num_qubits)
+            self._state_is_tensor = True
+        return self._state
+    
+    def _from_tensor(self, psi):
+        """Store a rank-n state tensor as the state (flattened on the next ``statevector`` read)."""
+        if self._mps is not None:
+            self._mps.set_statevector(psi.reshape(-1))
+            return
+        self._state = psi
+        self._state_is_tensor = True
+    
+    def apply_diagonal_gate(self, gate: Union[np.ndarray, jnp.ndarray], qubit_indices: list):
+        """
+        Apply a diagonal gate as an elementwise phase multiply.
+        
+        A diagonal gate (Z, S, T, RZ, CZ, CRZ, ...) only rescales amplitudes, so
+        its diagonal is broadcast over the target qubit axes: O(2^n) work with
+        no contraction.
+        
+        Args:
+            gate: The gate's diagonal (length 2^k), or the full diagonal matrix
+            qubit_indices: Qubit indices the gate acts on, as for ``apply_gate``
+        """
+        diagonal = gate.diagonal() if gate.ndim == 2 else gate
+        if diagonal.shape[0] != 1 << len(qubit_indices):
+            raise ValueError(f"Diagonal of size {diagonal.shape[0]} does not match "
+                             f"{len(qubit_indices)} qubit indices")
+        if self._mps is not None:
+            self.apply_gate(np.diag(diagonal), qubit_indices)
+            return
+        if self.use_gpu:
+            diagonal = cp.asarray(diagonal)
+        psi = apply_tensor_op(self._xp, self._as_tensor(), self.num_qubits, 'apply_diagonal_gate',
+                              tuple(int(q) for q in qubit_indices), diagonal)
+        self._from_tensor(psi)
+    
+    def _apply_kernel(self, method: str, qubits: Tuple[int, ...]):
+        """Run the pure tensor kernel registered for ``method`` on the statevector."""
+        if self._mps is not None:
+            if method == 'apply_cnot_chain':
+                for pair in zip(qubits[:-1], qubits[1:]):
+                    self._mps.apply_gate(as_dtype(quantum_gates.CNOT(), self.dtype), pair)
+            else:
+                self._mps.apply_gate(as_dtype(_MPS_GATES[method](), self.dtype), qubits)
+            return
+        psi = apply_tensor_op(self._xp, self._as_tensor(), self.num_qubits, method, qubits)
+        self._from_tensor(psi)
+    
+    # Fast paths for common gates: permutations and sign/phase flips on one qubit
+    # axis of the state tensor, instead of a general matrix contraction.
+    
+    def apply_x(self, qubit: int):
+        """Apply Pauli-X by swapping the two halves of the qubit axis."""
+        self._apply_kernel('apply_x', (qubit,))
+    
+    def apply_y(self, qubit: int):
+        """Apply Pauli-Y as an X permutation followed by ∓i phases."""
+        self._apply_kernel('apply_y', (qubit,))
+    
+    def apply_z(self, qubit: int):
+        """Apply Pauli-Z by negating the |1⟩ half of the qubit axis."""
+        self._apply_kernel('apply_z', (qubit,))
+    
+    def apply_s(self, qubit: int):
+        """Apply the S gate as a phase of i on the |1⟩ half."""
+        self._apply_kernel('apply_s', (qubit,))
+    
+    def apply_t(self, qubit: int):
+        """Apply the T gate as a phase of e^{iπ/4} on the |1⟩ half."""
+        self._apply_kernel('apply_t', (qubit,))
+    
+    def apply_h(self, qubit: int):
+        """Apply Hadamard as (|a0 + a1⟩, |a0 - a1⟩)/√2 along the qubit axis."""
+        self._apply_kernel('apply_h', (qubit,))
+    
+    def apply_cnot(self, control: int, target: int):
+        """Apply CNOT by flipping the target axis wherever the control is |1⟩."""
+        self._apply_kernel('apply_cnot', (control, target))
+    
+    def apply_swap(self, qubit1: int, qubit2: int):
+        """Apply SWAP by exchanging the two qubit axes of the state tensor."""
+        self._apply_kernel('apply_swap', (qubit1, qubit2))
+    
+    def apply_permutation(self, perm: np.ndarray):
+        """Reorder the amplitudes of every basis state with one gather: ``s -> s[..., perm]``."""
+        self.statevector = self._xp.take(self.statevector, self._xp.asarray(perm), axis=-1)
+    
+    def apply_cnot_chain(self, *qubits: int):
+        """Apply the CNOT chain CNOT(q0, q1), CNOT(q1, q2), ... as a single permutation."""
+        self._apply_kernel('apply_cnot_chain', tuple(int(q) for q in qubits))
+    
+    def get_statevector(self):
+        """
+        Get a snapshot of the current statevector, left on its backend.
+        
+        JAX arrays are immutable and are returned as is (no device-to-host
+        transfer or sync); NumPy and CuPy states are copied on their device.
+        Use ``to_numpy`` for a host array.
+        """
+        if self.use_jax:
+            return self.statevector
+        return self.statevector.copy()
+    
+    def to_numpy(self) -> np.ndarray:
+        """Get the current statevector as a NumPy array, transferring and syncing as needed."""
         if self.use_jax:
             return np.array(self.statevector)
+        if self.use_gpu:
+            return cp.asnumpy(self.statevector)
         return self.statevector.copy()
     
     def measure(self, qubit: int) -> int:
@@ -167,65 +856,114 @@ class FPGASimulator:
         if qubit < 0 or qubit >= self.num_qubits:
             raise ValueError(f"Qubit index {qubit} out of range [0, {self.num_qubits})")
         
-        # Calculate probability of measuring |0⟩
-        prob_0 = 0.0
-        state_array = self.get_statevector()
-        
-        for i in range(self.dimension):
-            if (i >> qubit) & 1 == 0:  # qubit is |0⟩
-                prob_0 += np.abs(state_array[i]) ** 2
+        # Probabilities of the qubit's |0⟩ and |1⟩ halves, in one reduction
+        if self.use_jax:
+            prob_0, prob_1 = _qubit_probabilities_jax(self.statevector, qubit).tolist()
+        else:
+            psi = self._as_tensor()
+            prob_0, prob_1 = (float(p) for p in _qubit_probabilities(self._xp, psi, qubit))
         
         # Collapse based on measurement
         result = int(np.random.random() > prob_0)
         
-        # Collapse statevector
-        if self.use_jax:
-            new_state = jnp.zeros_like(self.statevector)
-            for i in range(self.dimension):
-                if ((i >> qubit) & 1) == result:
-                    new_state = new_state.at[i].set(self.statevector[i])
-                else:
-                    new_state = new_state.at[i].set(0.0)
-            
-            # Normalize
-            norm = jnp.sqrt(jnp.sum(jnp.abs(new_state) ** 2))
-            if norm > 1e-10:
-                self.statevector = new_state / norm
+        # Collapse statevector: zero the other half and renormalize in one pass
+        norm = math.sqrt(prob_1 if result else prob_0)
+        if norm > 1e-10:
+            if self.use_jax:
+                self.statevector = _collapse_jax(self.statevector, qubit, result, norm)
             else:
-                self.reset()
+                self._from_tensor(_collapse(self._xp, psi, qubit, result, norm))
         else:
-            new_state = np.zeros_like(self.statevector)
-            for i in range(self.dimension):
-                if ((i >> qubit) & 1) == result:
-                    new_state[i] = self.statevector[i]
-                else:
-                    new_state[i] = 0.0
-            
-            # Normalize
-            norm = np.sqrt(np.sum(np.abs(new_state) ** 2))
-            if norm > 1e-10:
-                self.statevector = new_state / norm
-            else:
-                self.reset()
+            self.reset()
         
         return result
     
+    def measure_all(self) -> List[int]:
+        """
+        Measure every qubit and collapse the statevector onto the outcome.
+        
+        Measuring the qubits one after another is equivalent to drawing one
+        basis state from the full distribution, so this takes a single sample
+        and a single write instead of n reductions and collapses.
+        
+        Returns:
+            The result of each qubit, indexed by qubit
+        """
+        probs = self.get_probabilities()
+        cdf = np.cumsum(probs)
+        # Scaling the draw by the total absorbs rounding in the normalization
+        index = min(int(np.searchsorted(cdf, np.random.random() * cdf[-1], side='right')),
+                    self.dimension - 1)
+        # Keep the amplitude's phase, as a sequence of collapses would
+        amplitude = complex(self.statevector[index])
+        phase = amplitude / abs(amplitude)
+        if self.use_jax:
+            self.statevector = self._place(jnp.zeros(self.dimension, dtype=self.dtype).at[index].set(phase))
+        else:
+            state = self._xp.zeros(self.dimension, dtype=self.dtype)
+            state[index] = phase
+            self.statevector = state
+        return [(index >> qubit) & 1 for qubit in range(self.num_qubits)]
+    
     def get_probabilities(self) -> np.ndarray:
         """Get measurement probabilities for all basis states."""
-        state_array = self.get_statevector()
-        return np.abs(state_array) ** 2
+        if self.use_jax:
+            return np.asarray(_probabilities_jax(self.statevector))
+        
+        # re^2 + im^2 accumulated into one output buffer, skipping the complex
+        # abs (and its sqrt) and the defensive statevector copy
+        state = self.statevector
+        probs = self._xp.square(state.real)
+        probs += self._xp.square(state.imag)
+        if self.use_gpu:
+            return cp.asnumpy(probs)
+        return probs
+    
+    def get_expectation_pauli(self, pauli_str: str) -> float:
+        """
+        Expectation value of a Pauli string, in O(2^n) without its matrix.
+        
+        With Y = iXZ, the string is a phase times X on some qubits and Z on
+        others: the X part permutes amplitudes by flipping index bits and the
+        Z part is a ±1 sign from the parity of the remaining bits.
+        
+        Args:
+            pauli_str: One of 'I', 'X', 'Y', 'Z' per qubit, written like a basis
+                label: the last character acts on qubit 0 (e.g. 'IZXI')
+            
+        Returns:
+            Expectation value <ψ|P|ψ>
+        """
+        if len(pauli_str) != self.num_qubits or set(pauli_str) - set('IXYZ'):
+            raise ValueError(f"Expected a string of {self.num_qubits} characters from 'IXYZ', "
+                             f"got {pauli_str!r}")
+        paulis = pauli_str[::-1]
+        x_qubits = tuple(q for q, p in enumerate(paulis) if p in 'XY')
+        z_qubits = tuple(q for q, p in enumerate(paulis) if p in 'YZ')
+        phase = 1j ** paulis.count('Y')
+        if self.use_jax:
+            x_mask = sum(1 << q for q in x_qubits)
+            z_mask = sum(1 << q for q in z_qubits)
+            return float(_pauli_expectation_jax(self.statevector, x_mask, z_mask, phase))
+        return _pauli_expectation(self._xp, self._as_tensor(), x_qubits, z_qubits, phase)
     
-    def get_expectation_value(self, observable: np.ndarray) -> float:
+    def get_expectation_value(self, observable: Union[np.ndarray, sparse.spmatrix, str]) -> float:
         """
         Calculate expectation value of an observable.
         
         Args:
-            observable: Hermitian operator matrix
+            observable: Hermitian operator matrix, dense or scipy sparse, or a
+                Pauli string (see ``get_expectation_pauli``)
             
         Returns:
             Expectation value <ψ|O|ψ>
         """
-        state_array = self.get_statevector()
+        if isinstance(observable, str):
+            return self.get_expectation_pauli(observable)
+        state_array = self.to_numpy()
+        if sparse.issparse(observable):
+            # O(nnz) sparse matvec on the host copy of the state
+            return float(np.real(np.vdot(state_array, observable @ state_array)))
         if self.use_jax:
             obs = jnp.array(observable)
             state = self.statevector
@@ -0,0 +1,121 @@
+"""
+Matrix Product State (MPS) Storage
+
+Stores an n-qubit state as a chain of rank-3 tensors, one per qubit, so that
+memory grows linearly in n for weakly entangled circuits instead of as 2^n.
+Used by FPGASimulator's 'tensornet' backend.
+"""
+
+import numpy as np
+from typing import List, Optional, Sequence
+
+from .quantum_gates import SWAP
+
+
+class MPSState:
+    """
+    Matrix product state on a chain of qubits.
+
+    Site q holds qubit q as a ``(left_bond, 2, right_bond)`` tensor. Two-qubit
+    gates are applied to neighbouring sites and split back with an SVD,
+    truncated to ``max_bond_dim`` and to singular values above ``cutoff``.
+    """
+
+    def __init__(self, num_qubits: int, dtype=np.complex128,
+                 max_bond_dim: Optional[int] = None, cutoff: float = 1e-12):
+        """
+        Initialize the MPS in |00...0⟩.
+
+        Args:
+            num_qubits: Number of qubits (sites)
+            dtype: Amplitude dtype of the site tensors
+            max_bond_dim: Largest bond dimension kept after each SVD (None: exact)
+            cutoff: Singular values at or below this (relative to the largest)
+                are dropped
+        """
+        self.num_qubits = num_qubits
+        self.dtype = dtype
+        self.max_bond_dim = max_bond_dim
+        self.cutoff = cutoff
+        self.reset()
+
+    def reset(self):
+        """Reset to the product state |00...0⟩ (all bonds of dimension 1)."""
+        site = np.zeros((1, 2, 1), dtype=self.dtype)
+        site[0, 0, 0] = 1.0
+        self.tensors: List[np.ndarray] = [site.copy() for _ in range(self.num_qubits)]
+
+    @property
+    def bond_dimensions(self) -> List[int]:
+        """Dimension of each of the ``num_qubits - 1`` internal bonds."""
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+
+    def apply_gate(self, gate: np.ndarray, qubits: Sequence[int]):
+        """
+        Apply a one- or two-qubit gate.
+
+        Args:
+            gate: 2x2 or 4x4 gate matrix (first listed qubit is the MSB)
+            qubits: Qubit indices the gate acts on
+        """
+        gate = np.asarray(gate, dtype=self.dtype)
+        if len(qubits) == 1:
+            q = qubits[0]
+            self.tensors[q] = np.einsum('ij,ajb->aib', gate, self.tensors[q])
+        elif len(qubits) == 2:
+            self._apply_two_qubit(gate.reshape(2, 2, 2, 2), int(qubits[0]), int(qubits[1]))
+        else:
+            raise ValueError(f"MPS gates act on one or two qubits, got {len(qubits)}")
+
+    def _apply_two_qubit(self, gate: np.ndarray, a: int, b: int):
+        """Apply a (2, 2, 2, 2) gate on qubits a, b, swapping b next to a if needed."""
+        # Move b along the chain to the site next to a, apply, then move it back
+        step = 1 if b > a else -1
+        swap = SWAP().reshape(2, 2, 2, 2)
+        for site in range(b, a + step, -step):
+            self._apply_adjacent(swap, min(site, site - step))
+        neighbour = a + step
+        if step == 1:
+            self._apply_adjacent(gate, a)
+        else:
+            # Site order is (b, a): swap the gate's two qubits to match
+            self._apply_adjacent(gate.transpose(1, 0, 3, 2), neighbour)
+        for site in range(neighbour + step, b + step, step):
+            self._apply_adjacent(swap, min(site, site - step))
+
+    def _apply_adjacent(self, gate: np.ndarray, site: int):
+        """Apply a (2, 2, 2, 2) gate to sites (site, site + 1) and re-split them."""
+        left, right = self.tensors[site], self.tensors[site + 1]
+        theta = np.einsum('ABab,lar,rbs->lABs', gate, left, right)
+        chi_left, chi_right = theta.shape[0], theta.shape[3]
+        u, s, vh = np.linalg.svd(theta.reshape(chi_left * 2, 2 * chi_right), full_matrices=False)
+        keep = max(1, int(np.count_nonzero(s > self.cutoff * s[0])))
+        if self.max_bond_dim is not None:
+            keep = min(keep, self.max_bond_dim)
+        self.tensors[site] = u[:, :keep].reshape(chi_left, 2, keep)
+        self.tensors[site + 1] = (s[:keep, None] * vh[:keep]).reshape(keep, 2, chi_right)
+
+    def to_statevector(self) -> np.ndarray:
+        """Contract the chain into the dense statevector (bit q of the index = qubit q)."""
+        psi = self.tensors[0].reshape(2, -1)
+        for tensor in self.tensors[1:]:
+            # Rows gain the next qubit as their new most significant bit
+            psi = np.einsum('ia,ajb->jib', psi, tensor).reshape(-1, tensor.shape[2])
+        return psi.reshape(-1)
+
+    def set_statevector(self, state: np.ndarray):
+        """Decompose a dense statevector into the chain by successive SVDs."""
+        # Axes ordered as sites: qubit 0 first, so reverse the index bits
+        rest = np.asarray(state, dtype=self.dtype).reshape((2,) * self.num_qubits)
+        rest = rest.transpose(range(self.num_qubits - 1, -1, -1)).reshape(1, -1)
+        tensors = []
+        for _ in range(self.num_qubits - 1):
+            chi_left = rest.shape[0]
+            u, s, vh = np.linalg.svd(rest.reshape(chi_left * 2, -1), full_matrices=False)
+            keep = max(1, int(np.count_nonzero(s > self.cutoff * s[0])))
+            if self.max_bond_dim is not None:
+                keep = min(keep, self.max_bond_dim)
+            tensors.append(u[:, :keep].reshape(chi_left, 2, keep))
+            rest = s[:keep, None] * vh[:keep]
+        tensors.append(rest.reshape(rest.shape[0], 2, 1))
+        self.tensors = tensors
@@ -0,0 +1,230 @@
+"""
+Lazily Compiled Parametric Circuits
+
+A ParametricCircuit only records its gates; rotations may take a named
+parameter instead of a number. ``compile()`` turns the recording into one
+jitted ``run(params) -> statevector``, so variational loops (VQE, QAOA) pay a
+single XLA call per parameter update instead of per-gate Python dispatch.
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+import jax
+import jax.numpy as jnp
+
+from .circuit import PROGRAM_GATES, _PROGRAM_FIXED, _PROGRAM_ROTATIONS, _fixed_gate_matrix
+from .fpga_simulator import _PRECISION_DTYPES, _gate_kernel_jax, apply_tensor_op
+from .quantum_gates import as_dtype
+
+# An angle: a number fixed at build time, or the name of a run-time parameter
+Angle = Union[float, str]
+
+
+def _rotation(axis: str, theta: jnp.ndarray) -> jnp.ndarray:
+    """RX/RY/RZ matrix of a traced angle."""
+    c, s = jnp.cos(theta / 2), jnp.sin(theta / 2)
+    if axis == 'x':
+        return jnp.array([[c, -1j * s], [-1j * s, c]])
+    if axis == 'y':
+        return jnp.array([[c, -s], [s, c]])
+    return jnp.array([[jnp.exp(-0.5j * theta), 0], [0, jnp.exp(0.5j * theta)]])
+
+
+def _traced_matrix(name: str, theta: jnp.ndarray) -> jnp.ndarray:
+    """Matrix of a parameterized program gate for a traced angle."""
+    base = _rotation(name[-1], theta)
+    if name.startswith('c'):
+        # Controlled on the first qubit: identity block, then the rotation
+        return jnp.zeros((4, 4), dtype=base.dtype).at[:2, :2].set(jnp.eye(2)).at[2:, 2:].set(base)
+    return base
+
+
+def _fixed_matrix(name: str, theta: Optional[float]) -> np.ndarray:
+    """Matrix of a program gate whose angle (if any) is known at build time."""
+    if name in _PROGRAM_ROTATIONS:
+        return _PROGRAM_ROTATIONS[name](np.array([theta]))[0]
+    return _fixed_gate_matrix(_PROGRAM_FIXED[name])
+
+
+class ParametricCircuit:
+    """
+    Gate recording compiled once into a jitted function of its parameters.
+
+    Gates use the ``QuantumCircuit.apply_program`` gate set. Leading gates
+    that do not depend on a parameter form a static prefix: it is simulated
+    once at compile time and its output state baked into the compiled
+    function as the initial state.
+    """
+
+    def __init__(self, num_qubits: int, precision: str = 'double'):
+        """
+        Initialize an empty parametric circuit.
+
+        Args:
+            num_qubits: Number of qubits in the circuit
+            precision: Amplitude precision, 'double' (complex128) or 'single' (complex64)
+        """
+        if precision not in _PRECISION_DTYPES:
+            raise ValueError(f"Precision must be one of {list(_PRECISION_DTYPES)}, got {precision!r}")
+        self.num_qubits = num_qubits
+        self.dtype = _PRECISION_DTYPES[precision]
+        if self.dtype == np.complex128:
+            # JAX silently truncates complex128 to complex64 unless x64 is on
+            jax.config.update("jax_enable_x64", True)
+        # Recorded gates as (program gate name, qubits, angle or None)
+        self.ops: List[Tuple[str, Tuple[int, ...], Optional[Angle]]] = []
+        # Parameter names in order of first use: the layout of ``params``
+        self.parameters: List[str] = []
+        self._parameter_index: Dict[str, int] = {}
+        self._compiled = None
+        self._compiled_batched = None
+
+    def append(self, name: str, *qubits: int, theta: Optional[Angle] = None):
+        """
+        Record a gate.
+
+        Args:
+            name: Gate name from ``PROGRAM_GATES`` (e.g. 'h', 'cnot', 'rx')
+            *qubits: Qubit indices the gate acts on
+            theta: Angle of a rotation: a number, or a parameter name bound at run time
+        """
+        if name not in PROGRAM_GATES:
+            raise ValueError(f"Unknown gate {name!r}, expected one of {PROGRAM_GATES}")
+        if (theta is None) != (name not in _PROGRAM_ROTATIONS):
+            raise ValueError(f"Gate {name!r} takes {'an' if name in _PROGRAM_ROTATIONS else 'no'} angle")
+        for q in qubits:
+            if q < 0 or q >= self.num_qubits:
+                raise ValueError(f"Qubit index {q} out of range [0, {self.num_qubits})")
+        if isinstance(theta, str) and theta not in self._parameter_index:
+            self._parameter_index[theta] = len(self.parameters)
+            self.parameters.append(theta)
+        self.ops.append((name, tuple(int(q) for q in qubits), theta))
+        self._compiled = self._compiled_batched = None
+
+    def h(self, qubit: int):
+        """Record a Hadamard gate."""
+        self.append('h', qubit)
+
+    def x(self, qubit: int):
+        """Record a Pauli-X gate."""
+        self.append('x', qubit)
+
+    def y(self, qubit: int):
+        """Record a Pauli-Y gate."""
+        self.append('y', qubit)
+
+    def z(self, qubit: int):
+        """Record a Pauli-Z gate."""
+        self.append('z', qubit)
+
+    def cnot(self, control: int, target: int):
+        """Record a CNOT gate."""
+        self.append('cnot', control, target)
+
+    def cz(self, control: int, target: int):
+        """Record a CZ gate."""
+        self.append('cz', control, target)
+
+    def swap(self, qubit1: int, qubit2: int):
+        """Record a SWAP gate."""
+        self.append('swap', qubit1, qubit2)
+
+    def rx(self, qubit: int, theta: Angle):
+        """Record an X-rotation by a number or a named parameter."""
+        self.append('rx', qubit, theta=theta)
+
+    def ry(self, qubit: int, theta: Angle):
+        """Record a Y-rotation by a number or a named parameter."""
+        self.append('ry', qubit, theta=theta)
+
+    def rz(self, qubit: int, theta: Angle):
+        """Record a Z-rotation by a number or a named parameter."""
+        self.append('rz', qubit, theta=theta)
+
+    def crx(self, control: int, target: int, theta: Angle):
+        """Record a controlled X-rotation."""
+        self.append('crx', control, target, theta=theta)
+
+    def cry(self, control: int, target: int, theta: Angle):
+        """Record a controlled Y-rotation."""
+        self.append('cry', control, target, theta=theta)
+
+    def crz(self, control: int, target: int, theta: Angle):
+        """Record a controlled Z-rotation."""
+        self.append('crz', control, target, theta=theta)
+
+    def _run_function(self):
+        """
+        The pure ``run(params) -> statevector`` of the recording (not yet jitted).
+
+        Gates before the first parameterized one are applied here, once, with
+        NumPy; fixed gates after it become compile-time constants, and only
+        the parameterized matrices are built from ``params`` at run time.
+        """
+        num_qubits = self.num_qubits
+        psi = np.zeros((2,) * num_qubits, dtype=self.dtype)
+        psi[(0,) * num_qubits] = 1.0
+        split = next((i for i, (_, _, theta) in enumerate(self.ops) if isinstance(theta, str)),
+                     len(self.ops))
+        for name, qubits, theta in self.ops[:split]:
+            matrix = as_dtype(_fixed_matrix(name, theta), self.dtype)
+            psi = apply_tensor_op(np, psi, num_qubits, 'apply_gate', qubits, matrix)
+        initial = np.ascontiguousarray(psi)
+
+        # Each remaining gate as (qubits, constant matrix or None, parameter index)
+        program = [(qubits, None, self._parameter_index[theta]) if isinstance(theta, str)
+                   else (qubits, _fixed_matrix(name, theta), None)
+                   for name, qubits, theta in self.ops[split:]]
+        names = [name for name, _, _ in self.ops[split:]]
+
+        def run(params):
+            psi = jnp.asarray(initial)
+            for name, (qubits, matrix, index) in zip(names, program):
+                if matrix is None:
+                    matrix = _traced_matrix(name, params[index])
+                psi = _gate_kernel_jax(len(qubits))(psi, matrix, qubit_indices=qubits)
+            return psi.reshape(-1)
+
+        return run
+
+    def compile(self):
+        """
+        Compile the circuit into a jitted ``run(params) -> statevector``.
+
+        The result is cached until another gate is recorded.
+
+        Returns:
+            Function of a length-``len(self.parameters)`` angle array (ordered
+            as ``self.parameters``) returning the flat final statevector
+        """
+        if self._compiled is None:
+            self._compiled = jax.jit(self._run_function())
+        return self._compiled
+
+    def compile_batched(self):
+        """
+        Compile ``run`` vectorized with ``jax.vmap`` over a batch of parameter sets.
+
+        Returns:
+            Jitted function of a ``(batch, len(self.parameters))`` angle array
+            returning the ``(batch, 2**n)`` final statevectors
+        """
+        if self._compiled_batched is None:
+            self._compiled_batched = jax.jit(jax.vmap(self._run_function()))
+        return self._compiled_batched
+
+    def run(self, params) -> jnp.ndarray:
+        """
+        Simulate the circuit for one set of parameter values, compiling lazily.
+
+        Args:
+            params: Angles ordered as ``self.parameters``
+
+        Returns:
+            Final statevector as a JAX array
+        """
+        return self.compile()(self._angles(params))
+
+    def _angles(self, params) -> jnp.ndarray:
+        """Parameter values as a JAX array in the real dtype of the amplitudes."""
+        return jnp.asarray(params, dtype=jnp.float64 if self.dtype == np.complex128 else jnp.float32)
@@ -5,47 +5,134 @@ This module provides quantum gate matrices optimized for FPGA-like parallel proc
 All gates are designed to work efficiently with the FPGASimulator.
 """
 
+import functools
+import math
 import numpy as np
 import jax.numpy as jnp
-from typing import Union, Optional
+from typing import Callable, Union, Optional
+
+
+def _constant(matrix) -> np.ndarray:
+    """Read-only complex128 gate matrix, shared by every call of its gate function."""
+    matrix = np.array(matrix, dtype=np.complex128)
+    matrix.setflags(write=False)
+    return matrix
+
+
+def _cached_by_angle(gate: Callable[[float], np.ndarray]) -> Callable[[float], np.ndarray]:
+    """
+    Cache a one-angle gate's matrices by angle, shared read-only.
+    
+    Real scalar angles hit an LRU cache; anything else (arrays, tracers) is
+    passed to the gate function uncached.
+    """
+    @functools.lru_cache(maxsize=4096)
+    def cached(theta: float) -> np.ndarray:
+        matrix = gate(theta)
+        matrix.setflags(write=False)
+        return matrix
+    
+    @functools.wraps(gate)
+    def wrapper(theta: float) -> np.ndarray:
+        if isinstance(theta, (int, float, np.integer, np.floating)):
+            return cached(float(theta))
+        return gate(theta)
+    
+    return wrapper
+
+
+# Parameterless gates are module-level constants: the functions hand out the
+# same read-only matrix instead of allocating a new one per call
+_I = _constant([[1, 0], [0, 1]])
+_X = _constant([[0, 1], [1, 0]])
+_Y = _constant([[0, -1j], [1j, 0]])
+_Z = _constant([[1, 0], [0, -1]])
+_H = _constant((1 / np.sqrt(2)) * np.array([[1, 1], [1, -1]]))
+_S = _constant([[1, 0], [0, 1j]])
+_T = _constant([[1, 0], [0, np.exp(1j * np.pi / 4)]])
+_CNOT = _constant([
+    [1, 0, 0, 0],
+    [0, 1, 0, 0],
+    [0, 0, 0, 1],
+    [0, 0, 1, 0]
+])
+_CZ = _constant(np.diag([1, 1, 1, -1]))
+_SWAP = _constant([
+    [1, 0, 0, 0],
+    [0, 0, 1, 0],
+    [0, 1, 0, 0],
+    [0, 0, 0, 1]
+])
+
+_CONSTANTS = {id(matrix): matrix for matrix in (_I, _X, _Y, _Z, _H, _S, _T, _CNOT, _CZ, _SWAP)}
+# Casts of the constants to other dtypes, made once per (constant, dtype)
+_CONSTANT_CASTS = {}
+
+
+def as_dtype(gate: np.ndarray, dtype) -> np.ndarray:
+    """
+    A gate matrix in another dtype (e.g. complex64 for single-precision states).
+    
+    Gates already in ``dtype`` are returned as is; the module's constant gates
+    are cast once and the read-only cast is shared from then on.
+    
+    Args:
+        gate: Gate matrix
+        dtype: Target dtype
+        
+    Returns:
+        ``gate`` with dtype ``dtype``
+    """
+    dtype = np.dtype(dtype)
+    if gate.dtype == dtype:
+        return gate
+    if _CONSTANTS.get(id(gate)) is not gate:
+        return gate.astype(dtype)
+    key = (id(gate), dtype)
+    if key not in _CONSTANT_CASTS:
+        cast = gate.astype(dtype)
+        cast.setflags(write=False)
+        _CONSTANT_CASTS[key] = cast
+    return _CONSTANT_CASTS[key]
 
 
 # Single-qubit gates
 def I() -> np.ndarray:
     """Identity gate."""
-    return np.array([[1, 0], [0, 1]], dtype=np.complex128)
+    return _I
 
 
 def X() -> np.ndarray:
     """Pauli-X (NOT) gate."""
-    return np.array([[0, 1], [1, 0]], dtype=np.complex128)
+    return _X
 
 
 def Y() -> np.ndarray:
     """Pauli-Y gate."""
-    return np.array([[0, -1j], [1j, 0]], dtype=np.complex128)
+    return _Y
 
 
 def Z() -> np.ndarray:
     """Pauli-Z gate."""
-    return np.array([[1, 0], [0, -1]], dtype=np.complex128)
+    return _Z
 
 
 def H() -> np.ndarray:
     """Hadamard gate."""
-    return (1 / np.sqrt(2)) * np.array([[1, 1], [1, -1]], dtype=np.complex128)
+    return _H
 
 
 def S() -> np.ndarray:
     """Phase gate (S = √Z)."""
-    return np.array([[1, 0], [0, 1j]], dtype=np.complex128)
+    return _S
 
 
 def T() -> np.ndarray:
     """T gate (π/8 gate)."""
-    return np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]], dtype=np.complex128)
+    return _T
 
 
+@_cached_by_angle
 def RX(theta: float) -> np.ndarray:
     """Rotation around X-axis."""
     c = np.cos(theta / 2)
@@ -53,6 +140,7 @@ def RX(theta: float) -> np.ndarray:
     return np.array([[c, s], [s, c]], dtype=np.complex128)
 
 
+@_cached_by_angle
 def RY(theta: float) -> np.ndarray:
     """Rotation around Y-axis."""
     c = np.cos(theta / 2)
@@ -60,6 +148,7 @@ def RY(theta: float) -> np.ndarray:
     return np.array([[c, -s], [s, c]], dtype=np.complex128)
 
 
+@_cached_by_angle
 def RZ(theta: float) -> np.ndarray:
     """Rotation around Z-axis."""
     return np.array([[np.exp(-1j * theta / 2), 0], 
@@ -69,34 +158,20 @@ def RZ(theta: float) -> np.ndarray:
 # Two-qubit gates
 def CNOT() -> np.ndarray:
     """Controlled-NOT gate (control on first qubit, target on second)."""
-    return np.array([
-        [1, 0, 0, 0],
-        [0, 1, 0, 0],
-        [0, 0, 0, 1],
-        [0, 0, 1, 0]
-    ], dtype=np.complex128)
+    return _CNOT
 
 
 def CZ() -> np.ndarray:
     """Controlled-Z gate."""
-    return np.array([
-        [1, 0, 0, 0],
-        [0, 1, 0, 0],
-        [0, 0, 1, 0],
-        [0, 0, 0, -1]
-    ], dtype=np.complex128)
+    return _CZ
 
 
 def SWAP() -> np.ndarray:
     """SWAP gate."""
-    return np.array([
-        [1, 0, 0, 0],
-        [0, 0, 1, 0],
-        [0, 1, 0, 0],
-        [0, 0, 0, 1]
-    ], dtype=np.complex128)
+    return _SWAP
 
 
+@_cached_by_angle
 def CRX(theta: float) -> np.ndarray:
     """Controlled-RX gate."""
     c = np.cos(theta / 2)
@@ -109,6 +184,7 @@ def CRX(theta: float) -> np.ndarray:
     ], dtype=np.complex128)
 
 
+@_cached_by_angle
 def CRY(theta: float) -> np.ndarray:
     """Controlled-RY gate."""
     c = np.cos(theta / 2)
@@ -121,6 +197,7 @@ def CRY(theta: float) -> np.ndarray:
     ], dtype=np.complex128)
 
 
+@_cached_by_angle
 def CRZ(theta: float) -> np.ndarray:
     """Controlled-RZ gate."""
     return np.array([
@@ -139,9 +216,17 @@ def tensor_product(*gates: np.ndarray) -> np.ndarray:
     This simulates FPGA's parallel multiplication units working on
     different qubit subspaces simultaneously.
     """
-    result = gates[0]
-    for gate in gates[1:]:
-        result = np.kron(result, gate)
+    if len(gates) == 1:
+        return gates[0]
+    # One einsum writes every product straight into the output, viewed as
+    # (rows of each gate..., columns of each gate...), with no intermediates
+    dims = [gate.shape[0] for gate in gates]
+    size = math.prod(dims)
+    result = np.empty((size, size), dtype=np.result_type(*gates))
+    rows = [chr(ord('a') + i) for i in range(len(gates))]
+    cols = [chr(ord('A') + i) for i in range(len(gates))]
+    subscripts = ','.join(r + c for r, c in zip(rows, cols)) + '->' + ''.join(rows + cols)
+    np.einsum(subscripts, *gates, out=result.reshape(dims + dims))
     return result
 
 
@@ -161,20 +246,32 @@ def create_controlled_gate(gate: np.ndarray, num_control_qubits: int = 1) -> np.
     
     result = np.eye(total_size, dtype=np.complex128)
     
-    # Set the controlled block
-    control_mask = (1 << num_control_qubits) - 1  # All control qubits set to 1
-    target_start = control_mask << int(np.log2(gate_size))
-    
-    for i in range(gate_size):
-        for j in range(gate_size):
-            idx_i = target_start | i
-            idx_j = target_start | j
-            result[idx_i, idx_j] = gate[i, j]
+    # Set the controlled block: the bottom-right corner, where all controls are 1
+    target_start = total_size - gate_size
+    result[target_start:, target_start:] = gate
     
     return result
 
 
 # Optimized gate application for common patterns
+
+# Pauli operators encoded by their (x, z) bits, so the Pauli part of a product
+# is the XOR of the codes
+_PAULI_CODES = {'I': 0, 'X': 1, 'Z': 2, 'Y': 3}
+_PAULI_MATRICES = (_I, _X, _Z, _Y)
+_PAULI_BY_ID = {id(matrix): code for code, matrix in enumerate(_PAULI_MATRICES)}
+# _PAULI_PHASES[a][b] = k such that P_a @ P_b = i^k P_(a ^ b)
+_PAULI_PHASES = (
+    (0, 0, 0, 0),
+    (0, 0, 3, 1),  # XZ = -iY, XY = iZ
+    (0, 1, 0, 3),  # ZX = iY,  ZY = -iX
+    (0, 3, 1, 0),  # YX = -iZ, YZ = iX
+)
+
+# Rotation gates that compose by adding angles, by tag
+_ROTATIONS = {'RX': RX, 'RY': RY, 'RZ': RZ}
+
+
 class GateOptimizer:
     """
     Optimizer for gate sequences that can be merged or optimized.
@@ -186,21 +283,73 @@ class GateOptimizer:
         """
         Optimize a sequence of Pauli gates.
         X^2 = I, Y^2 = I, Z^2 = I, etc.
+        
+        The product is tracked as an element of the Pauli group, a phase i^k
+        times one of I, X, Y, Z, with a table lookup per gate instead of a
+        matrix multiply.
+        
+        Args:
+            gates: Pauli names ('I', 'X', 'Y', 'Z') or the matrices returned
+                by ``I()``, ``X()``, ... (any other matrix falls back to
+                multiplying the sequence out)
+            
+        Returns:
+            The product ``gates[0] @ gates[1] @ ...`` as a 2x2 matrix
         """
-        result = I()
-        for gate in gates:
-            result = result @ gate
-        return result
+        codes = [_PAULI_CODES.get(gate) if isinstance(gate, str) else _PAULI_BY_ID.get(id(gate))
+                 for gate in gates]
+        if None in codes:
+            result = I()
+            for gate in gates:
+                result = result @ gate
+            return result
+        pauli = phase = 0
+        for code in codes:
+            phase += _PAULI_PHASES[pauli][code]
+            pauli ^= code
+        return 1j ** (phase % 4) * _PAULI_MATRICES[pauli]
+    
+    @staticmethod
+    def coalesce_rotations(rotations: list) -> list:
+        """
+        Merge runs of same-axis rotations: RZ(θ1) RZ(θ2) = RZ(θ1 + θ2).
+        
+        Args:
+            rotations: Tagged rotations such as ``[('RZ', 0.1), ('RZ', 0.2), ('RX', 0.3)]``
+            
+        Returns:
+            The sequence with each run of equal tags replaced by one rotation
+            by the summed angle, e.g. ``[('RZ', 0.3), ('RX', 0.3)]``
+        """
+        merged = []
+        for axis, theta in rotations:
+            if axis not in _ROTATIONS:
+                raise ValueError(f"Unknown rotation {axis!r}, expected one of {list(_ROTATIONS)}")
+            if merged and merged[-1][0] == axis:
+                merged[-1] = (axis, merged[-1][1] + theta)
+            else:
+                merged.append((axis, theta))
+        return merged
     
     @staticmethod
     def merge_rotations(rotations: list) -> np.ndarray:
         """
         Merge consecutive rotations around the same axis.
+        
+        Tagged rotations are coalesced first (see ``coalesce_rotations``), so a
+        run of any length costs one gate instead of a chain of matmuls.
+        
+        Args:
+            rotations: Tagged rotations ``(axis, theta)`` with axis 'RX', 'RY'
+                or 'RZ', or plain gate matrices
+            
+        Returns:
+            The product ``rotations[0] @ rotations[1] @ ...`` as a 2x2 matrix
         """
-        # Implementation would merge RZ(θ1) RZ(θ2) = RZ(θ1 + θ2)
-        # This is a simplified version
+        if all(isinstance(rot, tuple) for rot in rotations):
+            rotations = [_ROTATIONS[axis](theta)
+                         for axis, theta in GateOptimizer.coalesce_rotations(rotations)]
         result = I()
         for rot in rotations:
             result = result @ rot
         return result
-
@@ -0,0 +1,341 @@
+"""
+Tests for QuantumCircuit execution against a dense reference simulator
+"""
+
+import numpy as np
+import pytest
+
+from simulator import quantum_gates
+from simulator.circuit import QuantumCircuit
+from simulator.fpga_simulator import FPGASimulator
+
+BACKENDS = [True, False]  # use_jax
+
+
+def _dense_operator(gate: np.ndarray, qubits, num_qubits: int) -> np.ndarray:
+    """Embed ``gate`` into the full space; qubit q is bit q, first listed qubit is the gate MSB."""
+    index = np.arange(1 << num_qubits)
+    # Gate-local index of every basis state, gathered with one shift/or per gate qubit
+    local = np.zeros_like(index)
+    for q in qubits:
+        local = (local << 1) | ((index >> q) & 1)
+    rest = index & ~sum(1 << q for q in qubits)
+    # Entries connect only basis states that agree on every other qubit
+    return np.where(rest[:, None] == rest[None, :], gate[local[:, None], local[None, :]], 0)
+
+
+def _reference_statevector(circuit: QuantumCircuit) -> np.ndarray:
+    """Apply the circuit's gates one dense matrix at a time."""
+    state = np.zeros(1 << circuit.num_qubits, dtype=np.complex128)
+    state[0] = 1.0
+    for gate_matrix, qubits, fast_path in circuit.gates:
+        if fast_path == 'apply_cnot_chain':
+            for pair in zip(qubits[:-1], qubits[1:]):
+                state = _dense_operator(quantum_gates.CNOT(), pair, circuit.num_qubits) @ state
+        else:
+            state = _dense_operator(gate_matrix, qubits, circuit.num_qubits) @ state
+    return state
+
+
+def _random_circuit(num_qubits: int, use_jax: bool, seed: int, **kwargs) -> QuantumCircuit:
+    rng = np.random.default_rng(seed)
+    circuit = QuantumCircuit(num_qubits, use_jax=use_jax, **kwargs)
+    single = [circuit.h, circuit.x, circuit.y, circuit.z,
+              lambda q: circuit.apply(quantum_gates.S, q),
+              lambda q: circuit.apply(quantum_gates.T, q)]
+    for _ in range(12):
+        q0, q1 = (int(q) for q in rng.choice(num_qubits, size=2, replace=False))
+        kind = rng.integers(6)
+        if kind == 0:
+            single[rng.integers(len(single))](q0)
+        elif kind == 1:
+            circuit.cnot(q0, q1)
+        elif kind == 2:
+            circuit.rx(q0, rng.uniform(0, 2 * np.pi))
+        elif kind == 3:
+            circuit.cry(q0, q1, rng.uniform(0, 2 * np.pi))
+        elif kind == 4:
+            circuit.swap(q0, q1)
+        else:
+            circuit.cnot_chain(*(int(q) for q in rng.permutation(num_qubits)))
+    return circuit
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+@pytest.mark.parametrize("gate", ['h', 'x', 'y', 'z'])
+def test_single_qubit_fast_paths(use_jax, gate):
+    circuit = QuantumCircuit(3, use_jax=use_jax)
+    circuit.ry(0, 0.3)
+    circuit.rx(1, 1.1)
+    circuit.ry(2, 2.0)
+    getattr(circuit, gate)(1)
+    np.testing.assert_allclose(circuit.execute(), _reference_statevector(circuit), atol=1e-12)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+@pytest.mark.parametrize("gate", [quantum_gates.S, quantum_gates.T])
+def test_phase_fast_paths(use_jax, gate):
+    circuit = QuantumCircuit(2, use_jax=use_jax)
+    circuit.h(0)
+    circuit.h(1)
+    circuit.apply(gate, 0)
+    np.testing.assert_allclose(circuit.execute(), _reference_statevector(circuit), atol=1e-12)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+def test_diagonal_fast_paths(use_jax):
+    circuit = QuantumCircuit(3, use_jax=use_jax)
+    for q in range(3):
+        circuit.h(q)
+    circuit.rz(1, 0.7)
+    circuit.cz(2, 0)
+    circuit.crz(0, 2, 1.3)
+    circuit.crz(2, 1, -0.4)
+    assert {method for method, _ in circuit._ops} >= {'apply_diagonal_gate'}
+    np.testing.assert_allclose(circuit.execute(), _reference_statevector(circuit), atol=1e-12)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+def test_cnot_control_target_order(use_jax):
+    # Control set: target flips, |q1 q0⟩ = |01⟩ -> |11⟩
+    circuit = QuantumCircuit(2, use_jax=use_jax)
+    circuit.x(0)
+    circuit.cnot(0, 1)
+    np.testing.assert_allclose(np.abs(circuit.execute()) ** 2, [0, 0, 0, 1], atol=1e-12)
+
+    # Only the target set: nothing happens
+    circuit = QuantumCircuit(2, use_jax=use_jax)
+    circuit.x(1)
+    circuit.cnot(0, 1)
+    np.testing.assert_allclose(np.abs(circuit.execute()) ** 2, [0, 0, 1, 0], atol=1e-12)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+def test_cnot_chain_matches_cnot_sequence(use_jax):
+    chain = QuantumCircuit(4, use_jax=use_jax)
+    sequence = QuantumCircuit(4, use_jax=use_jax)
+    for circuit in (chain, sequence):
+        circuit.h(2)
+        circuit.rx(0, 0.7)
+    chain.cnot_chain(2, 0, 3, 1)
+    for control, target in ((2, 0), (0, 3), (3, 1)):
+        sequence.cnot(control, target)
+    np.testing.assert_allclose(chain.execute(), sequence.execute(), atol=1e-12)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+@pytest.mark.parametrize("seed", range(4))
+def test_random_circuit_matches_reference(use_jax, seed):
+    circuit = _random_circuit(4, use_jax, seed)
+    expected = _reference_statevector(circuit)
+    # The second execution of a repeated structure runs the compiled whole-circuit executor
+    for _ in range(3):
+        np.testing.assert_allclose(circuit.execute(), expected, atol=1e-10)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+def test_execute_contracted_matches_reference(use_jax):
+    circuit = _random_circuit(4, use_jax, seed=7)
+    np.testing.assert_allclose(circuit.execute_contracted(), _reference_statevector(circuit), atol=1e-10)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+def test_batched_execution(use_jax):
+    circuit = _random_circuit(3, use_jax, seed=11)
+    expected = _reference_statevector(circuit)
+    for _ in range(2):
+        batched = circuit.execute(batch_size=5)
+        assert batched.shape == (5, 8)
+        np.testing.assert_allclose(batched, np.broadcast_to(expected, (5, 8)), atol=1e-10)
+    np.testing.assert_allclose(circuit.execute_contracted(batch_size=3),
+                               np.broadcast_to(expected, (3, 8)), atol=1e-10)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+def test_prepare_ghz(use_jax):
+    circuit = QuantumCircuit(4, use_jax=use_jax)
+    circuit.h(0)
+    circuit.cnot_chain(0, 1, 2, 3)
+    np.testing.assert_allclose(circuit.prepare_ghz(), circuit.execute(), atol=1e-12)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+def test_precision_dtypes(use_jax):
+    assert QuantumCircuit(2, use_jax=use_jax).execute().dtype == np.complex128
+    circuit = QuantumCircuit(2, use_jax=use_jax, precision='single')
+    circuit.h(0)
+    circuit.cry(0, 1, 0.4)
+    state = circuit.execute()
+    assert state.dtype == np.complex64
+    np.testing.assert_allclose(state, _reference_statevector(circuit), atol=1e-6)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+@pytest.mark.parametrize("wire", range(3))
+def test_expval_single_qubit_matches_dense(use_jax, wire):
+    circuit = _random_circuit(3, use_jax, seed=3)
+    state = circuit.execute()
+    for op in (quantum_gates.X(), quantum_gates.Y(), quantum_gates.Z(), quantum_gates.H()):
+        expected = np.real(np.vdot(state, _dense_operator(op, [wire], 3) @ state))
+        assert circuit.expval_single_qubit(op, wire) == pytest.approx(expected, abs=1e-10)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+@pytest.mark.parametrize("max_fused_qubits", [1, 2, 3, 4])
+def test_run_circuit_fused_matches_gate_by_gate(use_jax, max_fused_qubits):
+    circuit = _random_circuit(4, use_jax, seed=5)
+    ops = [(gate_matrix, qubits) for gate_matrix, qubits, fast_path in circuit.gates
+           if fast_path != 'apply_cnot_chain']
+    simulator = FPGASimulator(4, use_jax=use_jax)
+    simulator.run_circuit(ops, max_fused_qubits=max_fused_qubits)
+    expected = FPGASimulator(4, use_jax=use_jax)
+    for gate_matrix, qubits in ops:
+        expected.apply_gate(gate_matrix, qubits)
+    np.testing.assert_allclose(simulator.get_statevector(), expected.get_statevector(), atol=1e-10)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+@pytest.mark.parametrize("qubit", range(3))
+def test_measure_collapses_onto_outcome(use_jax, qubit):
+    circuit = _random_circuit(3, use_jax, seed=9)
+    state = circuit.execute()
+    result = circuit.simulator.measure(qubit)
+    keep = ((np.arange(8) >> qubit) & 1) == result
+    expected = np.where(keep, state, 0)
+    np.testing.assert_allclose(circuit.simulator.get_statevector(),
+                               expected / np.linalg.norm(expected), atol=1e-10)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_tensornet_backend_matches_reference(seed):
+    circuit = _random_circuit(5, use_jax=False, seed=seed, backend='tensornet')
+    circuit.cz(4, 0)
+    circuit.rz(2, 0.9)
+    np.testing.assert_allclose(circuit.execute(), _reference_statevector(circuit), atol=1e-10)
+    assert max(circuit.simulator._mps.bond_dimensions) <= 4
+
+
+def test_tensornet_backend_scales_past_statevector_cap():
+    # A 40-qubit GHZ state; reading it back densely would need 2^40 amplitudes
+    simulator = FPGASimulator(40, backend='tensornet', max_bond_dim=2)
+    simulator.apply_h(0)
+    for q in range(39):
+        simulator.apply_cnot(q, q + 1)
+    assert simulator._mps.bond_dimensions == [2] * 39
+    with pytest.raises(ValueError):
+        FPGASimulator(31)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+@pytest.mark.parametrize("pauli_str", ['ZII', 'IZZ', 'XIY', 'YYX', 'ZXY', 'III'])
+def test_expectation_pauli_matches_dense(use_jax, pauli_str):
+    circuit = _random_circuit(3, use_jax, seed=13)
+    state = np.asarray(circuit.execute())
+    paulis = {'I': quantum_gates.I(), 'X': quantum_gates.X(), 'Y': quantum_gates.Y(), 'Z': quantum_gates.Z()}
+    # The first character is the most significant qubit, like a basis label
+    observable = quantum_gates.tensor_product(*(paulis[p] for p in pauli_str))
+    expected = np.real(np.vdot(state, observable @ state))
+    assert circuit.get_expectation_pauli(pauli_str) == pytest.approx(expected, abs=1e-10)
+
+
+def test_gate_optimizer_merges_algebraically():
+    optimizer = quantum_gates.GateOptimizer
+    paulis = {'I': quantum_gates.I(), 'X': quantum_gates.X(), 'Y': quantum_gates.Y(), 'Z': quantum_gates.Z()}
+    for sequence in ('XY', 'YXZ', 'ZZXYYX', 'YZXI'):
+        expected = np.linalg.multi_dot([paulis[p] for p in sequence])
+        np.testing.assert_allclose(optimizer.optimize_pauli_sequence(list(sequence)), expected, atol=1e-12)
+        np.testing.assert_allclose(optimizer.optimize_pauli_sequence([paulis[p] for p in sequence]),
+                                   expected, atol=1e-12)
+    rotations = [('RZ', 0.1), ('RZ', 0.4), ('RX', 0.3), ('RX', -0.2), ('RZ', 1.0)]
+    assert [axis for axis, _ in optimizer.coalesce_rotations(rotations)] == ['RZ', 'RX', 'RZ']
+    expected = np.linalg.multi_dot([getattr(quantum_gates, axis)(theta) for axis, theta in rotations])
+    np.testing.assert_allclose(optimizer.merge_rotations(rotations), expected, atol=1e-12)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+def test_measure_all_collapses_onto_sampled_basis_state(use_jax):
+    circuit = _random_circuit(3, use_jax, seed=9)
+    probabilities = np.abs(np.asarray(circuit.execute())) ** 2
+    results = circuit.measure_all()
+    index = sum(bit << qubit for qubit, bit in enumerate(results))
+    assert probabilities[index] > 0
+    np.testing.assert_allclose(np.abs(circuit.simulator.to_numpy()), np.eye(8)[index], atol=1e-12)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+def test_precompiled_gates_match_traced(use_jax):
+    circuit = _random_circuit(4, use_jax, seed=6)
+    ops = [(gate_matrix, qubits) for gate_matrix, qubits, fast_path in circuit.gates
+           if fast_path != 'apply_cnot_chain']
+    simulator = FPGASimulator(4, use_jax=use_jax)
+    simulator.precompile([(gate_matrix.shape[0], qubits) for gate_matrix, qubits in ops])
+    assert len(simulator._compiled) == (len({tuple(qubits) for _, qubits in ops}) if use_jax else 0)
+    expected = FPGASimulator(4, use_jax=use_jax)
+    for gate_matrix, qubits in ops:
+        simulator.apply_gate(np.array(gate_matrix), qubits)
+        expected.apply_gate(gate_matrix, qubits)
+    np.testing.assert_allclose(simulator.to_numpy(), expected.to_numpy(), atol=1e-10)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_numba_backend_matches_reference(seed):
+    pytest.importorskip("numba")
+    circuit = _random_circuit(4, use_jax=False, seed=seed, backend='numba')
+    expected = _reference_statevector(circuit)
+    np.testing.assert_allclose(circuit.execute(), expected, atol=1e-10)
+    np.testing.assert_allclose(circuit.execute(batch_size=3), np.broadcast_to(expected, (3, 16)), atol=1e-10)
+
+
+def test_explicit_cpu_device_keeps_state_committed():
+    jax = pytest.importorskip("jax")
+    circuit = _random_circuit(3, use_jax=True, seed=2, device='cpu')
+    expected = _reference_statevector(circuit)
+    for _ in range(2):
+        np.testing.assert_allclose(circuit.execute(), expected, atol=1e-10)
+    assert circuit.simulator.statevector.devices() == {jax.devices('cpu')[0]}
+    with pytest.raises(ValueError):
+        FPGASimulator(3, device='tpu')
+
+
+def test_parametric_circuit_matches_quantum_circuit():
+    from simulator.parametric import ParametricCircuit
+    parametric = ParametricCircuit(3)
+    parametric.h(0)
+    parametric.ry(1, 0.4)
+    parametric.cnot(0, 2)
+    parametric.rx(0, 'a')
+    parametric.crz(0, 1, 'b')
+    parametric.cry(2, 1, 'a')
+    parametric.swap(0, 2)
+    parametric.rz(2, 1.1)
+    assert parametric.parameters == ['a', 'b']
+    for a, b in ((0.3, -1.2), (2.0, 0.7)):
+        circuit = QuantumCircuit(3, use_jax=False)
+        circuit.h(0)
+        circuit.ry(1, 0.4)
+        circuit.cnot(0, 2)
+        circuit.rx(0, a)
+        circuit.crz(0, 1, b)
+        circuit.cry(2, 1, a)
+        circuit.swap(0, 2)
+        circuit.rz(2, 1.1)
+        np.testing.assert_allclose(np.asarray(parametric.run([a, b])), _reference_statevector(circuit),
+                                   atol=1e-10)
+
+
+@pytest.mark.parametrize("use_jax", BACKENDS)
+def test_run_batched_matches_per_parameter_runs(use_jax):
+    from simulator.parametric import ParametricCircuit
+    parametric = ParametricCircuit(3)
+    parametric.h(1)
+    parametric.ry(0, 'a')
+    parametric.crx(0, 2, 'b')
+    parametric.cnot(2, 1)
+    parametric.rz(1, 'a')
+    params_batch = np.random.default_rng(8).uniform(0, 2 * np.pi, size=(5, 2))
+    simulator = FPGASimulator(3, use_jax=use_jax)
+    states = simulator.run_batched(parametric, params_batch)
+    assert states.shape == (5, 8)
+    for params, state in zip(params_batch, np.asarray(states)):
+        np.testing.assert_allclose(state, np.asarray(parametric.run(params)), atol=1e-12)
+    np.testing.assert_allclose(np.abs(simulator.to_numpy()) ** 2, simulator.get_probabilities(), atol=1e-12)
@@ -0,0 +1,139 @@
+"""
+Tests for the Steane lookup decoder and batched syndrome sampling
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from qec.decoder import SteaneDecoder, UnionFindDecoder
+from qec.feedback_loop import QECFeedbackLoop
+from qec.simulator import ErrorSimulator
+
+
+@pytest.mark.parametrize("error_type", ['x', 'z'])
+@pytest.mark.parametrize("qubit", range(7))
+def test_single_errors_are_corrected(error_type, qubit):
+    simulator = ErrorSimulator(code_type="steane")
+    simulator.errors = {'x': [], 'z': [], error_type: [qubit]}
+    correction = SteaneDecoder().decode(*simulator.measure_syndrome())
+    assert correction[error_type] == [qubit]
+    assert simulator.apply_correction(correction)
+
+
+def test_no_error_gives_empty_correction():
+    assert SteaneDecoder().decode([0, 0, 0], [0, 0, 0]) == {'x': [], 'z': []}
+
+
+def test_decode_batch_matches_decode():
+    decoder = SteaneDecoder()
+    # Every 6-bit syndrome, X bits first
+    syndromes = (np.arange(64)[:, None] >> np.arange(6)) & 1
+    corrections_x, corrections_z = decoder.decode_batch(syndromes[:, :3], syndromes[:, 3:])
+    for syndrome, correction_x, correction_z in zip(syndromes, corrections_x, corrections_z):
+        expected = decoder.decode(list(syndrome[:3]), list(syndrome[3:]))
+        assert list(np.flatnonzero(correction_x)) == expected['x']
+        assert list(np.flatnonzero(correction_z)) == expected['z']
+
+
+def test_decode_correction_matches_decode():
+    decoder = SteaneDecoder()
+    for index in range(64):
+        syndrome_x = [(index >> i) & 1 for i in range(3)]
+        syndrome_z = [(index >> i) & 1 for i in range(3, 6)]
+        expected = decoder.decode(syndrome_x, syndrome_z)
+        correction = decoder.decode_correction(syndrome_x, syndrome_z)
+        assert decoder.decode_packed(index) == correction
+        assert ([correction.x] if correction.x >= 0 else []) == expected['x']
+        assert ([correction.z] if correction.z >= 0 else []) == expected['z']
+
+
+@pytest.mark.parametrize("code_size", [3, 5, 7])
+def test_union_find_reproduces_graph_edge_syndromes(code_size):
+    decoder = UnionFindDecoder(code_size)
+    for error_type, stabilizers in (('x', decoder.x_stabilizers), ('z', decoder.z_stabilizers)):
+        empty = {'x': [0] * len(decoder.x_stabilizers), 'z': [0] * len(decoder.z_stabilizers)}
+        for qubit in range(decoder.num_qubits):
+            syndrome = [int(qubit in stabilizer) for stabilizer in stabilizers]
+            # Errors on qubits checked by one or two stabilizers are single graph edges
+            if not 0 < sum(syndrome) <= 2:
+                continue
+            correction = decoder.decode(*{**empty, error_type: syndrome}.values())[error_type]
+            assert [sum(q in stabilizer for q in correction) % 2 for stabilizer in stabilizers] == syndrome
+
+
+def test_union_find_kernel_compiled_at_construction():
+    pytest.importorskip("numba")
+    # Fresh interpreter: other tests may already have compiled the kernel
+    script = ("from qec import decoder; decoder.UnionFindDecoder(3); "
+              "assert decoder._union_find_decode.signatures")
+    subprocess.run([sys.executable, "-c", script], check=True,
+                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_sample_batch_syndromes_match_measure_syndrome():
+    simulator = ErrorSimulator(code_type="steane", error_rate=0.3)
+    errors, syndromes = simulator.sample_batch(200)
+    assert errors.shape == (200, 2, 7)
+    assert syndromes.shape == (200, 6)
+    for error, syndrome in zip(errors, syndromes):
+        simulator.error_array = error
+        np.testing.assert_array_equal(simulator.error_array, error)
+        syndrome_x, syndrome_z = simulator.measure_syndrome()
+        assert list(syndrome) == syndrome_x + syndrome_z
+
+
+@pytest.mark.parametrize("code_type, code_size", [("steane", 7), ("surface", 5)])
+def test_sample_and_measure_matches_introduce_and_measure(code_type, code_size):
+    stepwise = ErrorSimulator(code_type=code_type, code_size=code_size, error_rate=0.3, seed=4)
+    fused = ErrorSimulator(code_type=code_type, code_size=code_size, error_rate=0.3, seed=4)
+    for _ in range(200):
+        stepwise.introduce_errors()
+        syndrome_x, syndrome_z = stepwise.measure_syndrome()
+        packed_x, packed_z, err_x, err_z = fused.sample_and_measure()
+        assert (err_x, err_z) == (stepwise.err_x, stepwise.err_z)
+        assert [(packed_x >> i) & 1 for i in range(len(syndrome_x))] == syndrome_x
+        assert [(packed_z >> i) & 1 for i in range(len(syndrome_z))] == syndrome_z
+
+
+def test_batched_feedback_loop_leaves_min_max_unset():
+    loop = QECFeedbackLoop(code_type="steane", decoder_type="steane")
+    results = loop.run_multiple_cycles(num_cycles=100)
+    assert results['total_cycles'] == 100
+    assert np.isnan(results['min_decoding_time_us'])
+    assert np.isnan(results['max_decoding_time_us'])
+
+
+def test_parallel_feedback_loop_merges_worker_statistics():
+    loop = QECFeedbackLoop(code_type="steane", decoder_type="steane")
+    results = loop.run_multiple_cycles(num_cycles=101, per_cycle=True, n_jobs=2)
+    assert results['total_cycles'] == 101
+    assert results['successful_corrections'] + results['failed_corrections'] == 101
+    assert 0 < results['min_decoding_time_us'] <= results['max_decoding_time_us']
+
+
+def test_run_cycle_batch_matches_run_batch():
+    loops = [QECFeedbackLoop(code_type="steane", decoder_type="steane") for _ in range(2)]
+    for loop in loops:
+        loop.simulator.rng = np.random.default_rng(5)
+    success_batch, _ = loops[0].run_batch(500)
+    success_cycles, _ = loops[1].run_cycle_batch(500)
+    np.testing.assert_array_equal(success_batch, success_cycles)
+    assert loops[1].stats['successful_corrections'] == int(success_batch.sum())
+
+
+@pytest.mark.parametrize("code_type, code_size", [("steane", 7), ("surface", 5)])
+def test_sample_batch_masks_match_sample_batch(code_type, code_size):
+    arrays = ErrorSimulator(code_type=code_type, code_size=code_size, error_rate=0.3, seed=2)
+    masks = ErrorSimulator(code_type=code_type, code_size=code_size, error_rate=0.3, seed=2)
+    errors, syndromes = arrays.sample_batch(300)
+    errors_x, errors_z, syndromes_x, syndromes_z = masks.sample_batch_masks(300)
+    num_x = arrays.num_x_stabilizers
+    pack = lambda bits: bits.astype(np.uint64) @ (np.uint64(1) << np.arange(bits.shape[1], dtype=np.uint64))
+    np.testing.assert_array_equal(pack(errors[:, 0]), errors_x)
+    np.testing.assert_array_equal(pack(errors[:, 1]), errors_z)
+    np.testing.assert_array_equal(pack(syndromes[:, :num_x]), syndromes_x)
+    np.testing.assert_array_equal(pack(syndromes[:, num_x:]), syndromes_z)
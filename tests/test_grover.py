@@ -0,0 +1,29 @@
+"""
+Tests for the fused Grover search example
+"""
+
+import numpy as np
+import pytest
+
+from examples.grover import MATRIX_POWER_MAX_QUBITS, grover_search, grover_statevector
+
+
+@pytest.mark.parametrize("num_qubits", [3, 4, 5, 6, MATRIX_POWER_MAX_QUBITS + 1])
+def test_grover_search_finds_target(num_qubits):
+    target = (1 << num_qubits) - 3
+    probabilities = grover_search(num_qubits, target).execute()
+    probabilities = np.abs(probabilities) ** 2
+    assert np.argmax(probabilities) == target
+    assert probabilities[target] > 0.9
+
+
+@pytest.mark.parametrize("num_qubits", [4, 5])
+def test_grover_statevector_matches_circuit(num_qubits):
+    target = 5
+    expected = grover_search(num_qubits, target).execute()
+    np.testing.assert_allclose(grover_statevector(num_qubits, target), expected, atol=1e-10)
+
+
+def test_grover_rejects_out_of_range_target():
+    with pytest.raises(ValueError):
+        grover_search(3, 8)